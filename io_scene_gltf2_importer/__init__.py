@@ -47,12 +47,28 @@ class ImportglTF2(Operator, ImportHelper):
 
     loglevel = bpy.props.EnumProperty(items=Log.getLevels(), description="Log Level", default=Log.default())
 
+    skin_max_influences = bpy.props.IntProperty(name="Max Bone Influences", description="Maximum number of bone influences per vertex, 0 for no limit", default=0, min=0)
+    skin_min_weight = bpy.props.FloatProperty(name="Min Bone Weight", description="Bone influences with a lower weight are ignored", default=0.0, min=0.0, max=1.0)
+
+    anim_filter = bpy.props.StringProperty(name="Animations", description="Comma separated names, indices or name patterns of animations to import, all if empty", default="")
+    anim_resample = bpy.props.BoolProperty(name="Resample Animations", description="Bake animations on each frame of the scene frame rate", default=False)
+    anim_reduce = bpy.props.BoolProperty(name="Reduce Keyframes", description="Remove keyframes that interpolation reproduces within tolerance", default=False)
+    anim_reduce_tolerance = bpy.props.FloatProperty(name="Reduction Tolerance", description="Maximum error of removed keyframes (radians for rotations)", default=0.0001, min=0.0, precision=5)
+
     def execute(self, context):
         return self.import_gltf2(context)
 
     def import_gltf2(self, context):
         bpy.context.scene.render.engine = 'CYCLES'
-        self.gltf = glTFImporter(self.filepath, self.loglevel)
+        import_settings = {
+            'skin_max_influences': self.skin_max_influences,
+            'skin_min_weight': self.skin_min_weight,
+            'anim_filter': self.anim_filter,
+            'anim_resample': self.anim_resample,
+            'anim_reduce': self.anim_reduce,
+            'anim_reduce_tolerance': self.anim_reduce_tolerance
+        }
+        self.gltf = glTFImporter(self.filepath, self.loglevel, import_settings)
         self.gltf.log.critical("Starting loading glTF file")
         success, txt = self.gltf.read()
         if not success:
@@ -61,11 +77,13 @@ class ImportglTF2(Operator, ImportHelper):
         self.gltf.log.critical("Data are loaded, start creating Blender stuff")
         self.gltf.blender_create()
         self.gltf.debug_missing()
+        self.gltf.release_accessors()
         self.gltf.log.critical("glTF import is now finished")
         self.gltf.log.removeHandler(self.gltf.log_handler)
 
-        # Switch to newly created main scene
-        bpy.context.screen.scene = bpy.data.scenes[self.gltf.blender.scene]
+        # Switch to newly created main scene (no screen in background mode)
+        if bpy.context.screen is not None:
+            bpy.context.screen.scene = bpy.data.scenes[self.gltf.blender.scene]
 
         return {'FINISHED'}
 
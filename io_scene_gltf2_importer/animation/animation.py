@@ -21,6 +21,9 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
+import bpy
+import math
+
 from .animchannel import *
 
 class Animation():
@@ -32,6 +35,9 @@ class Animation():
 
         self.channels = []
 
+        self.blender_actions          = {} # Action name per Blender object name
+        self.blender_shapekey_actions = {} # Shape keys action name per Blender object name
+
     def read(self):
         if not 'channels' in self.json.keys():
             return
@@ -57,6 +63,54 @@ class Animation():
             else:
                 self.gltf.log.error("ERROR, node not found")
 
+    def get_blender_name(self):
+        if self.name:
+            return self.name
+        return "Animation_" + str(self.index)
+
+    def get_blender_action(self, obj):
+        # One action per object, shared by all bones of an armature
+        if obj.name not in self.blender_actions.keys():
+            action = bpy.data.actions.new(self.get_blender_name() + "_" + obj.name)
+            self.blender_actions[obj.name] = action.name
+        return bpy.data.actions[self.blender_actions[obj.name]]
+
+    def get_blender_shapekey_action(self, obj):
+        if obj.name not in self.blender_shapekey_actions.keys():
+            action = bpy.data.actions.new(self.get_blender_name() + "_" + obj.name + "_ShapeKeys")
+            self.blender_shapekey_actions[obj.name] = action.name
+        return bpy.data.actions[self.blender_shapekey_actions[obj.name]]
+
+    def blender_push_nla(self, mute):
+        # mute is the same for all datablocks, so that a single animation plays
+        for obj_name, action_name in self.blender_actions.items():
+            self.push_action(bpy.data.objects[obj_name], action_name, mute)
+
+        for obj_name, action_name in self.blender_shapekey_actions.items():
+            self.push_action(bpy.data.objects[obj_name].data.shape_keys, action_name, mute)
+
+    def push_action(self, id_data, action_name, mute):
+        action = bpy.data.actions[action_name]
+        if not id_data.animation_data:
+            id_data.animation_data_create()
+
+        track = id_data.animation_data.nla_tracks.new()
+        track.name = self.get_blender_name()
+
+        # Strips are created on an integer frame, move it to first key (fractional or negative)
+        start = action.frame_range[0]
+        strip = track.strips.new(self.get_blender_name(), int(math.floor(start)), action)
+        shift = start - math.floor(start)
+        if shift != 0.0:
+            end = strip.frame_end + shift
+            # Start first : setting end recomputes strip scale from start
+            strip.frame_start = start
+            strip.frame_end = end
+
+        track.mute = mute
+
+        id_data.animation_data.action = None
+
     def debug_missing(self):
         keys = [
                 'samplers',
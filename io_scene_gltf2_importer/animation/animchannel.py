@@ -21,7 +21,11 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
+import bpy
+
 from .sampler import *
+from .resampling import *
+from .reduction import *
 
 class AnimChannel():
     def __init__(self, index, json, anim, gltf):
@@ -45,9 +49,21 @@ class AnimChannel():
                 if len(prim.targets) > channels:
                     channels = len(prim.targets)
         self.sampler = Sampler(self.json['sampler'], self.anim.json['samplers'][self.json['sampler']], self.gltf, channels)
-        self.data = self.sampler.read()
+        # Columnar data : times (keys), values (keys, components) or (keys, targets) for weights
+        self.times, self.values = self.sampler.read()
         self.sampler.debug_missing()
         self.interpolation = self.sampler.interpolation
+        self.in_tangents   = self.sampler.in_tangents
+        self.out_tangents  = self.sampler.out_tangents
+
+        if self.gltf.import_settings['anim_resample']:
+            fps = bpy.context.scene.render.fps / bpy.context.scene.render.fps_base
+            self.times, self.values, self.interpolation = Resampling(self.gltf).resample(self.times, self.values, self.interpolation, self.in_tangents, self.out_tangents, fps, self.path == "rotation")
+            self.in_tangents  = None
+            self.out_tangents = None
+
+        if self.gltf.import_settings['anim_reduce']:
+            self.times, self.values = Reduction(self.gltf).reduce(self.times, self.values, self.interpolation, self.path == "rotation")
 
 
     def debug_missing(self):
@@ -22,6 +22,7 @@
  """
 
 import bpy
+import numpy as np
 from mathutils import Quaternion, Matrix, Vector
 
 class AnimationBone():
@@ -31,95 +32,68 @@ class AnimationBone():
     def anim(self):
         obj   = bpy.data.objects[self.animation.gltf.skins[self.animation.node.skin_id].blender_armature_name]
         bone  = obj.pose.bones[self.animation.node.blender_bone_name]
-        fps = bpy.context.scene.render.fps
+        fps = bpy.context.scene.render.fps / bpy.context.scene.render.fps_base
 
+        self.set_bone_transforms()
 
         for anim in self.animation.anims.keys():
-            if self.animation.gltf.animations[anim].name:
-                name = self.animation.gltf.animations[anim].name + "_" + obj.name
-            else:
-                name = "Animation_" + str(self.animation.gltf.animations[anim].index) + "_" + obj.name
-            if name not in bpy.data.actions:
-                action = bpy.data.actions.new(name)
-            else:
-                action = bpy.data.actions[name]
-            if not obj.animation_data:
-                obj.animation_data_create()
-            obj.animation_data.action = bpy.data.actions[action.name]
-
             for channel in self.animation.anims[anim]:
+                frames = channel.times * fps
+                values = channel.values
+                in_tangents = out_tangents = None
+                if channel.interpolation == "CUBICSPLINE":
+                    # Per frame instead of per second
+                    in_tangents  = channel.in_tangents / fps
+                    out_tangents = channel.out_tangents / fps
+
                 if channel.path == "translation":
                     blender_path = "location"
-                    for key in channel.data:
-                        transform = Matrix.Translation(self.animation.gltf.convert.location(list(key[1])))
-                        if not self.animation.node.parent:
-                            mat = transform
-                        else:
-                            if not self.animation.gltf.scene.nodes[self.animation.node.parent].is_joint: # TODO if Node in another scene
-                                mat = transform
-                            else:
-                                parent_mat = self.animation.gltf.scene.nodes[self.animation.node.parent].blender_bone_matrix
-
-                                mat = (parent_mat.to_quaternion() * transform.to_quaternion()).to_matrix().to_4x4()
-                                mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * transform.to_translation() )) * mat
-
-                        bone.location = self.animation.node.blender_bone_matrix.inverted() * mat.to_translation()
-                        bone.keyframe_insert(blender_path, frame = key[0] * fps, group='location')
-
-
-                    # Setting interpolation
-                    for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                        for kf in fcurve.keyframe_points:
-                            self.animation.set_interpolation(channel.interpolation, kf)
+                    # Affine transformation, tangents only go through linear part
+                    linear, offset = self.location_transform
+                    values = self.animation.gltf.convert.locations(values).dot(linear.T) + offset
+                    if in_tangents is not None:
+                        in_tangents  = self.animation.gltf.convert.locations(in_tangents).dot(linear.T)
+                        out_tangents = self.animation.gltf.convert.locations(out_tangents).dot(linear.T)
 
                 elif channel.path == "rotation":
                     blender_path = "rotation_quaternion"
-                    for key in channel.data:
-                        transform = (self.animation.gltf.convert.quaternion(key[1])).to_matrix().to_4x4()
-                        if not self.animation.node.parent:
-                            mat = transform
-                        else:
-                            if not self.animation.gltf.scene.nodes[self.animation.node.parent].is_joint: # TODO if Node in another scene
-                                mat = transform
-                            else:
-                                parent_mat = self.animation.gltf.scene.nodes[self.animation.node.parent].blender_bone_matrix
-
-                                mat = (parent_mat.to_quaternion() * transform.to_quaternion()).to_matrix().to_4x4()
-                                mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * transform.to_translation() )) * mat
-
-                        bone.rotation_quaternion = self.animation.node.blender_bone_matrix.to_quaternion().inverted() * mat.to_quaternion()
-                        bone.keyframe_insert(blender_path, frame = key[0] * fps, group='rotation')
-
-                    # Setting interpolation
-                    for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                        for kf in fcurve.keyframe_points:
-                            self.animation.set_interpolation(channel.interpolation, kf)
-
+                    # Quaternion product is linear, so it applies to tangents too
+                    values = self.animation.gltf.convert.quaternions(values).dot(self.rotation_transform.T)
+                    values /= np.linalg.norm(values, axis=1)[:, np.newaxis]
+                    if in_tangents is not None:
+                        in_tangents  = self.animation.gltf.convert.quaternions(in_tangents).dot(self.rotation_transform.T)
+                        out_tangents = self.animation.gltf.convert.quaternions(out_tangents).dot(self.rotation_transform.T)
 
                 elif channel.path == "scale":
                     blender_path = "scale"
-                    for key in channel.data:
-                        s = self.animation.gltf.convert.scale(list(key[1]))
-                        transform = Matrix([
-                            [s[0], 0, 0, 0],
-                            [0, s[1], 0, 0],
-                            [0, 0, s[2], 0],
-                            [0, 0, 0, 1]
-                        ])
-
-                        if not self.animation.node.parent:
-                            mat = transform
-                        else:
-                            if not self.animation.gltf.scene.nodes[self.animation.node.parent].is_joint: # TODO if Node in another scene
-                                mat = transform
-                            else:
-                                parent_mat = self.animation.gltf.scene.nodes[self.animation.node.parent].blender_bone_matrix
-                                mat = parent_mat.inverted() * transform
-
-                        bone.scale = mat.to_scale()
-                        bone.keyframe_insert(blender_path, frame = key[0] * fps, group='scale')
-
-                    # Setting interpolation
-                    for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                        for kf in fcurve.keyframe_points:
-                            self.animation.set_interpolation(channel.interpolation, kf)
+                    # Bone matrices have no scale, so scale is kept as is
+                    values = self.animation.gltf.convert.scales(values)
+                    if in_tangents is not None:
+                        in_tangents  = self.animation.gltf.convert.scales(in_tangents)
+                        out_tangents = self.animation.gltf.convert.scales(out_tangents)
+
+                else:
+                    continue
+
+                # Action is shared by all bones of the armature, bones are fcurve groups
+                action = self.animation.gltf.animations[anim].get_blender_action(obj)
+                self.animation.set_keyframes(action, bone.path_from_id(blender_path), bone.name, frames, values, channel.interpolation, in_tangents, out_tangents)
+
+    def set_bone_transforms(self):
+        # Conversion from parent space to bone space, constant for all keys
+        parent_mat = Matrix()
+        if self.animation.node.parent is not None and self.animation.gltf.scene.nodes[self.animation.node.parent].is_joint: # TODO if Node in another scene
+            parent_mat = self.animation.gltf.scene.nodes[self.animation.node.parent].blender_bone_matrix
+
+        # Bone matrices have no scale : location is an affine transformation
+        mat = np.array(self.animation.node.blender_bone_matrix.inverted() * parent_mat)
+        self.location_transform = (mat[0:3, 0:3], mat[0:3, 3])
+
+        # Rotation is a left quaternion product, as a matrix on w, x, y, z
+        w, x, y, z = self.animation.node.blender_bone_matrix.to_quaternion().inverted() * parent_mat.to_quaternion()
+        self.rotation_transform = np.array([
+            [w, -x, -y, -z],
+            [x,  w, -z,  y],
+            [y,  z,  w, -x],
+            [z, -y,  x,  w]
+        ])
@@ -21,9 +21,18 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
+import numpy as np
+
 from .animation_node import *
 from .animation_bone import *
 
+# Raw values of keyframe enum properties, for foreach_set
+KEYFRAME_ENUMS = {
+    'interpolation'     : {'CONSTANT': 0, 'LINEAR': 1, 'BEZIER': 2},
+    'handle_left_type'  : {'FREE': 0},
+    'handle_right_type' : {'FREE': 0},
+}
+
 class AnimationData():
     def __init__(self, node, gltf):
         self.node = node
@@ -47,15 +56,86 @@ class AnimationData():
         for child in self.node.children:
             child.animation.blender_anim()
 
-    def set_interpolation(self, interpolation, kf):
+    def set_keyframes(self, action, data_path, group, frames, values, interpolation="LINEAR", in_tangents=None, out_tangents=None):
+        """Write all keys of a channel, one fcurve per component, in bulk.
+
+        Tangents, if any, are CUBICSPLINE derivatives in value per frame.
+        """
+        frames = np.asarray(frames, dtype=np.float32)
+        values = np.asarray(values, dtype=np.float32).reshape(len(frames), -1)
+        if in_tangents is not None:
+            in_tangents  = np.asarray(in_tangents, dtype=np.float32).reshape(values.shape)
+            out_tangents = np.asarray(out_tangents, dtype=np.float32).reshape(values.shape)
+
+        co = np.empty((len(frames), 2), dtype=np.float32)
+        co[:, 0] = frames
+
+        fcurves = []
+        for index in range(values.shape[1]):
+            # Channel is written from scratch
+            fcurve = action.fcurves.find(data_path, index)
+            if fcurve is not None:
+                action.fcurves.remove(fcurve)
+            fcurve = action.fcurves.new(data_path, index, group)
+
+            co[:, 1] = values[:, index]
+            fcurve.keyframe_points.add(len(frames))
+            fcurve.keyframe_points.foreach_set('co', co.ravel())
+
+            self.set_interpolation(interpolation, fcurve)
+            if in_tangents is not None:
+                self.set_handles(fcurve, frames, values[:, index], in_tangents[:, index], out_tangents[:, index])
+
+            fcurve.update()
+
+            fcurves.append(fcurve)
+
+        return fcurves
+
+    def set_interpolation(self, interpolation, fcurve):
         if interpolation == "LINEAR":
-            kf.interpolation = 'LINEAR'
+            blender_interpolation = 'LINEAR'
         elif interpolation == "STEP":
-            kf.interpolation = 'CONSTANT'
+            blender_interpolation = 'CONSTANT'
         elif interpolation == "CATMULLROMSPLINE":
-            kf.interpolation = 'BEZIER' #TODO
+            blender_interpolation = 'BEZIER' #TODO
         elif interpolation == "CUBICSPLINE":
-            kf.interpolation = 'BEZIER' #TODO
+            blender_interpolation = 'BEZIER'
         else:
-            self.gltf.log.error("Unknown interpolation : " + self.interpolation)
-            kf.interpolation = 'BEZIER'
+            self.gltf.log.error("Unknown interpolation : " + interpolation)
+            blender_interpolation = 'BEZIER'
+
+        # New keyframe points are already BEZIER
+        if blender_interpolation != 'BEZIER':
+            self.set_keyframes_enum(fcurve, 'interpolation', blender_interpolation)
+
+    def set_handles(self, fcurve, frames, values, in_tangents, out_tangents):
+        # Hermite to Bezier : handles are a third of the key interval away,
+        # left handle on previous interval, right handle on next one
+        intervals = np.diff(frames)
+        if len(intervals) == 0:
+            intervals = np.zeros(1, dtype=np.float32)
+        left_intervals  = np.concatenate((intervals[:1], intervals)) / 3.0
+        right_intervals = np.concatenate((intervals, intervals[-1:])) / 3.0
+
+        handles_left = np.empty((len(frames), 2), dtype=np.float32)
+        handles_left[:, 0] = frames - left_intervals
+        handles_left[:, 1] = values - in_tangents * left_intervals
+
+        handles_right = np.empty((len(frames), 2), dtype=np.float32)
+        handles_right[:, 0] = frames + right_intervals
+        handles_right[:, 1] = values + out_tangents * right_intervals
+
+        # Free handles, so that they are not recomputed on update
+        self.set_keyframes_enum(fcurve, 'handle_left_type', 'FREE')
+        self.set_keyframes_enum(fcurve, 'handle_right_type', 'FREE')
+        fcurve.keyframe_points.foreach_set('handle_left', handles_left.ravel())
+        fcurve.keyframe_points.foreach_set('handle_right', handles_right.ravel())
+
+    def set_keyframes_enum(self, fcurve, attribute, value):
+        try:
+            fcurve.keyframe_points.foreach_set(attribute, [KEYFRAME_ENUMS[attribute][value]] * len(fcurve.keyframe_points))
+        except (TypeError, RuntimeError):
+            # foreach_set rejects enum properties on Blender 2.7x (RuntimeError)
+            for kf in fcurve.keyframe_points:
+                setattr(kf, attribute, value)
@@ -31,60 +31,55 @@ class AnimationNode():
 
     def anim(self):
         obj = bpy.data.objects[self.animation.node.blender_object]
-        fps = bpy.context.scene.render.fps
+        fps = bpy.context.scene.render.fps / bpy.context.scene.render.fps_base
 
         for anim in self.animation.anims.keys():
-            if self.animation.gltf.animations[anim].name:
-                name = self.animation.gltf.animations[anim].name + "_" + obj.name
-            else:
-                name = "self.animation_" + str(self.animation.gltf.animations[anim].index) + "_" + obj.name
-            action = bpy.data.actions.new(name)
-            if not obj.animation_data:
-                obj.animation_data_create()
-            obj.animation_data.action = bpy.data.actions[action.name]
+            animation = self.animation.gltf.animations[anim]
 
             for channel in self.animation.anims[anim]:
+                frames = channel.times * fps
+                in_tangents = out_tangents = None
+                if channel.interpolation == "CUBICSPLINE":
+                    # Per frame instead of per second
+                    in_tangents  = channel.in_tangents / fps
+                    out_tangents = channel.out_tangents / fps
+
                 if channel.path in ['translation', 'rotation', 'scale']:
 
                     if channel.path == "translation":
                         blender_path = "location"
-                        for key in channel.data:
-                           obj.location = Vector(self.animation.gltf.convert.location(list(key[1])))
-                           obj.keyframe_insert(blender_path, frame = key[0] * fps, group='location')
-
-                        # Setting interpolation
-                        for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                            for kf in fcurve.keyframe_points:
-                                self.animation.set_interpolation(channel.interpolation, kf)
+                        group = "location"
+                        conversion = self.animation.gltf.convert.locations
 
                     elif channel.path == "rotation":
                         blender_path = "rotation_quaternion"
-                        for key in channel.data:
-                            obj.rotation_quaternion = self.animation.gltf.convert.quaternion(key[1])
-                            obj.keyframe_insert(blender_path, frame = key[0] * fps, group='rotation')
-
-                        # Setting interpolation
-                        for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                            for kf in fcurve.keyframe_points:
-                                self.animation.set_interpolation(channel.interpolation, kf)
-
+                        group = "rotation"
+                        conversion = self.animation.gltf.convert.quaternions
 
                     elif channel.path == "scale":
                         blender_path = "scale"
-                        for key in channel.data:
-                            obj.scale = Vector(self.animation.gltf.convert.scale(list(key[1])))
-                            obj.keyframe_insert(blender_path, frame = key[0] * fps, group='scale')
+                        group = "scale"
+                        conversion = self.animation.gltf.convert.scales
 
-                        # Setting interpolation
-                        for fcurve in [curve for curve in obj.animation_data.action.fcurves if curve.group.name == "rotation"]:
-                            for kf in fcurve.keyframe_points:
-                                self.animation.set_interpolation(channel.interpolation, kf)
+                    # Conversions are linear, so apply to tangents too
+                    if in_tangents is not None:
+                        in_tangents  = conversion(in_tangents)
+                        out_tangents = conversion(out_tangents)
+
+                    action = animation.get_blender_action(obj)
+                    self.animation.set_keyframes(action, blender_path, group, frames, conversion(channel.values), channel.interpolation, in_tangents, out_tangents)
 
                 elif channel.path == 'weights':
-                    cpt_sk = 0
-                    for sk in channel.data:
-                        for key in sk:
-                            obj.data.shape_keys.key_blocks[cpt_sk+1].value = key[1]
-                            obj.data.shape_keys.key_blocks[cpt_sk+1].keyframe_insert("value", frame=key[0] * fps, group='ShapeKeys')
+                    # Shape keys are animated through their Key datablock
+                    shape_keys = obj.data.shape_keys
+                    sk_action = animation.get_blender_shapekey_action(obj)
+
+                    for cpt_sk in range(channel.values.shape[1]):
+                        blender_path = 'key_blocks["' + shape_keys.key_blocks[cpt_sk+1].name + '"].value'
+
+                        sk_in_tangents = sk_out_tangents = None
+                        if in_tangents is not None:
+                            sk_in_tangents  = in_tangents[:, cpt_sk]
+                            sk_out_tangents = out_tangents[:, cpt_sk]
 
-                        cpt_sk += 1
+                        self.animation.set_keyframes(sk_action, blender_path, 'ShapeKeys', frames, channel.values[:, cpt_sk], channel.interpolation, sk_in_tangents, sk_out_tangents)
@@ -0,0 +1,105 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ * This development is done in strong collaboration with Airbus Defence & Space
+ """
+
+import numpy as np
+
+class Reduction():
+    def __init__(self, gltf):
+        self.gltf = gltf # Reference to global glTF instance
+
+    def reduce(self, times, values, interpolation, rotation=False):
+        """Remove keys that interpolation of remaining keys reproduces within tolerance.
+
+        values is a (keys, components) array. Rotation error is the angle between
+        quaternions, other errors are the largest component difference.
+        """
+        tolerance = self.gltf.import_settings['anim_reduce_tolerance']
+
+        # Tangents would no longer match once keys are removed
+        if interpolation not in ["LINEAR", "STEP"] or len(times) < 2:
+            return times, values
+
+        # Constant channel
+        if np.all(self.error(values, values[0:1], rotation) <= tolerance):
+            return times[0:1], values[0:1]
+
+        keep = np.ones(len(times), dtype=bool)
+        while True:
+            removed = self.removable(times, values, keep, interpolation, rotation, tolerance)
+            if len(removed) == 0:
+                break
+            keep[removed] = False
+
+        self.gltf.log.debug("Animation keys reduced from " + str(len(times)) + " to " + str(np.count_nonzero(keep)))
+
+        return times[keep], values[keep]
+
+    def removable(self, times, values, keep, interpolation, rotation, tolerance):
+        # Returns kept keys that can be removed together, checked against all original keys
+        kept = np.flatnonzero(keep)
+        if len(kept) < 3:
+            return kept[0:0]
+
+        # Position in kept keys of the last kept key at or before each key
+        pos = np.searchsorted(kept, np.arange(len(times)), side='right') - 1
+
+        # Removing kept key c makes kept[c-1] to kept[c+1] a single segment.
+        # Keys inside that segment are c itself, and removed keys on each side.
+        removed_keys = np.flatnonzero(~keep)
+        candidates = np.concatenate((pos, pos[removed_keys] + 1))
+        keys       = np.concatenate((np.arange(len(times)), removed_keys))
+        valid = (candidates >= 1) & (candidates <= len(kept) - 2)
+        candidates = candidates[valid]
+        keys       = keys[valid]
+
+        start = kept[candidates - 1]
+        end   = kept[candidates + 1]
+        if interpolation == "STEP":
+            interpolated = values[start]
+        else:
+            span = times[end] - times[start]
+            span[span == 0.0] = 1.0
+            factor = (times[keys] - times[start]) / span
+            interpolated = values[start] + (values[end] - values[start]) * factor[:, np.newaxis]
+
+        errors = np.zeros(len(kept))
+        np.maximum.at(errors, candidates, self.error(values[keys], interpolated, rotation))
+
+        removable = np.zeros(len(kept), dtype=bool)
+        removable[1:-1] = errors[1:-1] <= tolerance
+
+        # Neighbours of a removed key must stay : remove every other key of each run
+        indices = np.arange(len(kept))
+        run_start = removable & ~np.concatenate(([False], removable[:-1]))
+        run_index = indices - np.maximum.accumulate(np.where(run_start, indices, 0))
+
+        return kept[removable & (run_index % 2 == 0)]
+
+    def error(self, values, reference, rotation):
+        if rotation:
+            # Angle between rotations, whatever the quaternion signs
+            norms = np.linalg.norm(values, axis=1) * np.linalg.norm(reference, axis=1)
+            dot = np.abs(np.sum(values * reference, axis=1)) / np.maximum(norms, 1e-12)
+            return 2.0 * np.arccos(np.clip(dot, 0.0, 1.0))
+
+        return np.max(np.abs(values - reference), axis=1)
@@ -0,0 +1,85 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ * This development is done in strong collaboration with Airbus Defence & Space
+ """
+
+import numpy as np
+
+class Resampling():
+    def __init__(self, gltf):
+        self.gltf = gltf # Reference to global glTF instance
+
+    def resample(self, times, values, interpolation, in_tangents, out_tangents, fps, rotation=False):
+        """Evaluate a channel on each integer frame covered by its keys.
+
+        Returns new times, values and interpolation. Tangents are no longer needed.
+        """
+        if len(times) < 2:
+            return times, values, "STEP" if interpolation == "STEP" else "LINEAR"
+
+        frames = np.arange(np.floor(times[0] * fps), np.ceil(times[-1] * fps) + 1.0)
+        sample_times = frames / fps
+
+        # Key before each sample, and position in its interval
+        before = np.clip(np.searchsorted(times, sample_times, side='right') - 1, 0, len(times) - 2)
+        span = times[before + 1] - times[before]
+        span[span == 0.0] = 1.0
+        factor = np.clip((sample_times - times[before]) / span, 0.0, 1.0)[:, np.newaxis]
+
+        if interpolation == "STEP":
+            values = values[np.where(factor[:, 0] < 1.0, before, before + 1)]
+            return sample_times, values, "STEP"
+
+        if interpolation == "CUBICSPLINE":
+            values = self.hermite(values[before], out_tangents[before] * span[:, np.newaxis],
+                                  values[before + 1], in_tangents[before + 1] * span[:, np.newaxis], factor)
+            if rotation:
+                values /= np.maximum(np.linalg.norm(values, axis=1), 1e-12)[:, np.newaxis]
+        elif rotation:
+            values = self.slerp(values[before], values[before + 1], factor)
+        else:
+            values = values[before] + (values[before + 1] - values[before]) * factor
+
+        return sample_times, values, "LINEAR"
+
+    def hermite(self, start, start_tangent, end, end_tangent, factor):
+        factor2 = factor * factor
+        factor3 = factor2 * factor
+        return (2 * factor3 - 3 * factor2 + 1) * start + (factor3 - 2 * factor2 + factor) * start_tangent \
+                + (-2 * factor3 + 3 * factor2) * end + (factor3 - factor2) * end_tangent
+
+    def slerp(self, start, end, factor):
+        # Shortest path
+        dot = np.sum(start * end, axis=1)
+        end = np.where(dot[:, np.newaxis] < 0.0, -end, end)
+        dot = np.clip(np.abs(dot), 0.0, 1.0)[:, np.newaxis]
+
+        angle = np.arccos(dot)
+        sin_angle = np.sin(angle)
+
+        # Nearly identical rotations fall back to linear interpolation
+        close = sin_angle < 1e-6
+        sin_angle[close] = 1.0
+        start_weight = np.where(close, 1.0 - factor, np.sin((1.0 - factor) * angle) / sin_angle)
+        end_weight   = np.where(close, factor, np.sin(factor * angle) / sin_angle)
+
+        values = start_weight * start + end_weight * end
+        return values / np.maximum(np.linalg.norm(values, axis=1), 1e-12)[:, np.newaxis]
@@ -32,36 +32,34 @@ class Sampler():
         self.channels = channels # for shape keys weights
 
     def read(self):
-        self.interpolation = self.json['interpolation']
-        self.input  = Accessor(self.json['input'], self.gltf.json['accessors'][self.json['input']], self.gltf)
-        self.output = Accessor(self.json['output'], self.gltf.json['accessors'][self.json['output']], self.gltf)
-        input_data  = self.input.read()
-        output_data = self.output.read()
+        self.interpolation = self.json.get('interpolation', 'LINEAR')
+        self.input  = self.gltf.get_accessor(self.json['input'])
+        self.output = self.gltf.get_accessor(self.json['output'])
+        input_data  = self.input.data
+        output_data = self.output.dequantize()
 
-        self.input.debug_missing()
-        self.output.debug_missing()
+        self.in_tangents  = None
+        self.out_tangents = None
+        if self.interpolation == "CUBICSPLINE":
+            # Each key is stored as in-tangent, value, out-tangent
+            cubic = output_data.reshape(len(input_data), 3, -1)
+            self.in_tangents  = cubic[:, 0]
+            output_data       = cubic[:, 1]
+            self.out_tangents = cubic[:, 2]
 
-        anim_data = []
+        times = input_data[:, 0]
 
         if self.channels == 0:
-            cpt_idx = 0
-            for i in input_data:
-                anim_data.append(tuple([input_data[cpt_idx][0], output_data[cpt_idx]]))
-                cpt_idx += 1
-
-            return anim_data
+            return times, output_data
 
         else:
+            # Weights are stored as (keys * targets) scalars
+            values = output_data.reshape(len(times), self.channels)
+            if self.in_tangents is not None:
+                self.in_tangents  = self.in_tangents.reshape(len(times), self.channels)
+                self.out_tangents = self.out_tangents.reshape(len(times), self.channels)
 
-            for chan in range(0, self.channels):
-                anim_data_chan = []
-                cpt_idx = 0
-                for i in input_data:
-                    anim_data_chan.append(tuple([input_data[cpt_idx][0], output_data[cpt_idx*self.channels+chan][0]]))
-                    cpt_idx += 1
-                anim_data.append(anim_data_chan)
-
-            return anim_data
+            return times, values
 
     def debug_missing(self):
         keys = [
@@ -21,63 +21,89 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
-import struct
+import numpy as np
 from .bufferview import *
 from .sparse import *
 
 
 class Accessor():
     def __init__(self, index, json, gltf):
+        self.index = index
         self.json  = json   # Accessor json
         self.gltf =  gltf # Reference to global glTF instance
         self.name = None
         self.normalized = False
+        self.data = None
+        self.dequantized = None
 
     def read(self):
-        if not 'bufferView' in self.json:
-            return
-
         if 'normalized' in self.json.keys():
             self.normalized = self.json['normalized']
 
         if 'name' in self.json.keys():
             self.name = self.json['name']
 
-        self.bufferView = BufferView(self.json['bufferView'], self.gltf.json['bufferViews'][self.json['bufferView']], self.gltf)
-        self.bufferView.read()
-        self.bufferView.debug_missing()
+        dtype = np.dtype('<' + self.gltf.fmt_char_dict[self.json['componentType']])
+        component_nb = self.gltf.component_nb_dict[self.json['type']]
 
-        fmt_char = self.gltf.fmt_char_dict[self.json['componentType']]
-        component_size = struct.calcsize(fmt_char)
+        if 'bufferView' in self.json.keys():
+            self.bufferView = BufferView(self.json['bufferView'], self.gltf.json['bufferViews'][self.json['bufferView']], self.gltf)
+            self.bufferView.read()
+            self.bufferView.debug_missing()
 
-        component_nb = self.gltf.component_nb_dict[self.json['type']]
-        fmt = '<' + (fmt_char * component_nb)
+            # TODO data alignment stuff
+
+            if 'byteOffset' in self.json.keys():
+                offset = self.json['byteOffset']
+            else:
+                offset = 0
 
-        stride = struct.calcsize(fmt)
+            self.data = self.bufferView.read_data(dtype, component_nb, self.json['count'], offset)
 
-        # TODO data alignment stuff
+        elif 'sparse' in self.json.keys():
+            # No bufferView : sparse values are applied on zeros
+            self.data = np.zeros((self.json['count'], component_nb), dtype=dtype)
 
-        if 'byteOffset' in self.json.keys():
-            offset = self.json['byteOffset']
         else:
-            offset = 0
+            return
 
         if 'sparse' in self.json.keys():
             self.sparse = Sparse(self.json['componentType'], self.json['type'], self.json['sparse'], self.gltf)
             self.sparse.read()
             self.sparse.debug_missing()
-            self.data = self.bufferView.read_data(fmt, stride, self.json['count'], offset)
             self.apply_sparse()
-            return self.data
 
-        else:
-            return self.bufferView.read_data(fmt, stride, self.json['count'], offset)
+        return self.data
 
     def apply_sparse(self):
-        cpt_idx = 0
-        for idx in self.sparse.indices:
-            self.data[idx[0]] = self.sparse.data[cpt_idx]
-            cpt_idx += 1
+        # Data can be a view on buffer, copy it before patching
+        if not self.data.flags.owndata:
+            self.data = np.array(self.data)
+        self.data[self.sparse.indices] = self.sparse.data
+
+    def dequantize(self):
+        # Float data of accessor, following spec formulas for normalized integers
+        if self.data is None or self.json['componentType'] == 5126:
+            return self.data
+
+        if self.dequantized is None:
+            data = self.data.astype(np.float32)
+            if self.normalized:
+                component_type = self.json['componentType']
+                if component_type == 5120:   # Byte
+                    data /= 127.0
+                    np.maximum(data, -1.0, out=data)
+                elif component_type == 5121: # Unsigned Byte
+                    data /= 255.0
+                elif component_type == 5122: # Short
+                    data /= 32767.0
+                    np.maximum(data, -1.0, out=data)
+                elif component_type == 5123: # Unsigned Short
+                    data /= 65535.0
+            data.flags.writeable = False
+            self.dequantized = data
+
+        return self.dequantized
 
     def debug_missing(self):
         keys = [
@@ -89,6 +115,7 @@ class Accessor():
                 'min', #TODO :  add some checks ?
                 'max', #TODO :  add some checks ?
                 'name',
+                'normalized',
                 'sparse'
                 ]
 
@@ -22,6 +22,7 @@
  """
 
 import base64
+import mmap
 from os.path import dirname, join
 
 class Buffer():
@@ -29,6 +30,7 @@ class Buffer():
         self.index = index
         self.json  = json  # buffer json
         self.gltf = gltf # Reference to global glTF instance
+        self.data = None
 
     def read(self):
 
@@ -47,8 +49,17 @@ class Buffer():
                     return
 
 
-            with open(join(dirname(self.gltf.filename), self.json['uri']), 'rb') as f_:
-                self.data = f_.read()
+            self.data = Buffer.map_file(join(dirname(self.gltf.filename), self.json['uri']))
+
+    @staticmethod
+    def map_file(filename):
+        # Map file read only, slices of returned memoryview are not copied
+        with open(filename, 'rb') as f_:
+            try:
+                return memoryview(mmap.mmap(f_.fileno(), 0, access=mmap.ACCESS_READ))
+            except ValueError:
+                # Empty files can't be mapped
+                return memoryview(b'')
 
     def debug_missing(self):
         keys = [
@@ -21,16 +21,32 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
-import struct
+import numpy as np
 from .buffer import *
+from .extensions import *
 
 class BufferView():
     def __init__(self, index, json, gltf):
         self.index = index
         self.json  = json  # bufferView json
         self.gltf = gltf # Reference to global glTF instance
+        self.data = None
 
     def read(self):
+        if 'extensions' in self.json.keys():
+            if 'EXT_meshopt_compression' in self.json['extensions'].keys():
+                # Decode only once, even if bufferView is used by several accessors
+                if self.index not in self.gltf.decoded_bufferviews.keys():
+                    self.EXT_meshopt_compression = EXT_meshopt_compression(self.json['extensions']['EXT_meshopt_compression'], self.gltf)
+                    self.EXT_meshopt_compression.read()
+                    self.EXT_meshopt_compression.debug_missing()
+                    self.gltf.decoded_bufferviews[self.index] = self.EXT_meshopt_compression.decode()
+                self.data = self.gltf.decoded_bufferviews[self.index]
+                if self.data is not None:
+                    return
+                # Decoding failed, use fallback buffer if any (read_data raises if it has no data)
+                self.gltf.log.error("EXT_meshopt_compression bufferView " + str(self.index) + " can't be decoded, using fallback buffer")
+
         if not 'buffer' in self.json.keys():
             return
 
@@ -40,8 +56,9 @@ class BufferView():
         self.buffer = self.gltf.buffers[self.json['buffer']]
         self.buffer.debug_missing()
 
-    def read_data(self, fmt, stride_, count, accessor_offset):
-        data = []
+        if self.buffer.data is None:
+            self.gltf.log.error("No data for buffer " + str(self.buffer.index))
+            return
 
         if 'byteOffset' in self.json.keys():
             bufferview_offset = self.json['byteOffset']
@@ -50,31 +67,31 @@ class BufferView():
 
         length = self.json['byteLength']
 
-        if 'byteStride' in self.json.keys():
-            stride = self.json['byteStride']
-        else:
-            stride = stride_
-
-        slice = self.buffer.data[bufferview_offset:bufferview_offset + length]
+        self.data = memoryview(self.buffer.data)[bufferview_offset:bufferview_offset + length]
 
+    def read_data(self, dtype, component_nb, count, accessor_offset):
+        # A view on no buffer would be uninitialized memory
+        if self.data is None:
+            raise RuntimeError("No data for bufferView " + str(self.index))
 
-        offset = accessor_offset
-        while len(data) < count:
-            element = struct.unpack_from(fmt, slice , offset)
-            data.append(element)
-            offset += stride
+        element_size = dtype.itemsize * component_nb
 
-        return data
-
-    def read_binary_data(self):
-        if 'byteOffset' in self.json.keys():
-            bufferview_offset = self.json['byteOffset']
+        if 'byteStride' in self.json.keys():
+            stride = self.json['byteStride']
         else:
-            bufferview_offset = 0
+            stride = element_size
 
-        length = self.json['byteLength']
+        # Strided view directly on buffer, no per element decoding
+        return np.ndarray(
+            shape=(count, component_nb),
+            dtype=dtype,
+            buffer=self.data,
+            offset=accessor_offset,
+            strides=(stride, dtype.itemsize)
+        )
 
-        return self.buffer.data[bufferview_offset:bufferview_offset + length]
+    def read_binary_data(self):
+        return self.data
 
 
     def debug_missing(self):
@@ -82,7 +99,8 @@ class BufferView():
                 'buffer',
                 'byteStride',
                 'byteOffset',
-                'byteLength'
+                'byteLength',
+                'extensions'
                 ]
 
         for key in self.json.keys():
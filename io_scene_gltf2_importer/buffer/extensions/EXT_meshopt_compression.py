@@ -0,0 +1,434 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ * This development is done in strong collaboration with Airbus Defence & Space
+ """
+
+import numpy as np
+from ..buffer import *
+
+class EXT_meshopt_compression():
+
+    # Byte group size, in compressed vertex stream, for each group mode (2 bits header)
+    GROUP_SIZES = [0, 4, 8, 16]
+
+    # Number of sentinel values (value read in an extra byte) in each packed byte
+    SENTINELS_2BITS = bytes([sum(1 for shift in (6, 4, 2, 0) if (b >> shift) & 3 == 3) for b in range(256)])
+    SENTINELS_4BITS = bytes([((b >> 4) == 15) + ((b & 15) == 15) for b in range(256)])
+
+    def __init__(self, json, gltf):
+        self.json = json # EXT_meshopt_compression json (bufferView extension)
+        self.gltf = gltf # Reference to global glTF instance
+
+    def read(self):
+        if self.json['buffer'] not in self.gltf.buffers:
+            self.gltf.buffers[self.json['buffer']] = Buffer(self.json['buffer'], self.gltf.json['buffers'][self.json['buffer']], self.gltf)
+            self.gltf.buffers[self.json['buffer']].read()
+        self.buffer = self.gltf.buffers[self.json['buffer']]
+        self.buffer.debug_missing()
+
+        if 'byteOffset' in self.json.keys():
+            offset = self.json['byteOffset']
+        else:
+            offset = 0
+
+        self.count  = self.json['count']
+        self.stride = self.json['byteStride']
+        self.mode   = self.json['mode']
+
+        if 'filter' in self.json.keys():
+            self.filter = self.json['filter']
+        else:
+            self.filter = "NONE"
+
+        self.source = memoryview(self.buffer.data)[offset:offset + self.json['byteLength']]
+
+    def decode(self):
+        # Returns uncompressed data of bufferView, or None if data can't be decoded
+        try:
+            if self.mode == "ATTRIBUTES":
+                data = self.decode_vertex_buffer()
+            elif self.mode == "TRIANGLES":
+                data = self.decode_index_buffer()
+            elif self.mode == "INDICES":
+                data = self.decode_index_sequence()
+            else:
+                self.gltf.log.error("Unknown EXT_meshopt_compression mode " + str(self.mode))
+                return None
+
+            if self.filter == "OCTAHEDRAL":
+                self.filter_octahedral(data)
+            elif self.filter == "QUATERNION":
+                self.filter_quaternion(data)
+            elif self.filter == "EXPONENTIAL":
+                self.filter_exponential(data)
+            elif self.filter != "NONE":
+                self.gltf.log.error("Unknown EXT_meshopt_compression filter " + str(self.filter))
+                return None
+
+        except (ValueError, IndexError) as e:
+            self.gltf.log.error("EXT_meshopt_compression decoding error: " + str(e))
+            return None
+
+        return memoryview(data.reshape(-1))
+
+    def decode_vertex_buffer(self):
+        src = bytes(self.source)
+        count  = self.count
+        stride = self.stride
+
+        if len(src) < 1 + stride or src[0] != 0xa0:
+            raise ValueError("bad vertex buffer header")
+
+        # First (sequential) pass : locate each byte group and its mode
+        # Vertices are split in blocks, each block stores byte k of all its vertices
+        # as groups of 16 bytes
+        block_size = min((8192 // stride) & ~15, 256)
+
+        group_offsets  = []
+        group_modes    = []
+        group_channels = []
+        group_vertices = []
+
+        pos = 1
+        for block_start in range(0, count, block_size):
+            block_count = min(block_size, count - block_start)
+            group_nb = (block_count + 15) // 16
+            header_size = (group_nb + 3) // 4
+
+            for k in range(stride):
+                header = pos
+                pos += header_size
+                for g in range(group_nb):
+                    mode = (src[header + g // 4] >> ((g % 4) * 2)) & 3
+                    group_offsets.append(pos)
+                    group_modes.append(mode)
+                    group_channels.append(k)
+                    group_vertices.append(block_start + g * 16)
+                    if mode == 1:
+                        pos += 4 + sum(src[pos:pos + 4].translate(self.SENTINELS_2BITS))
+                    elif mode == 2:
+                        pos += 8 + sum(src[pos:pos + 8].translate(self.SENTINELS_4BITS))
+                    else:
+                        pos += self.GROUP_SIZES[mode]
+
+        tail_size = max(32, stride)
+        if pos != len(src) - tail_size:
+            raise ValueError("bad vertex buffer size")
+
+        # Second pass, vectorized : expand all groups
+        data = np.frombuffer(src, dtype=np.uint8)
+        group_offsets = np.array(group_offsets, dtype=np.int64)
+        group_modes   = np.array(group_modes, dtype=np.uint8)
+        values = np.zeros((len(group_offsets), 16), dtype=np.uint8)
+        element = np.arange(16)
+
+        sel = group_modes == 3
+        values[sel] = data[group_offsets[sel][:, None] + element]
+
+        for mode, bits in ((1, 2), (2, 4)):
+            sel = group_modes == mode
+            offsets = group_offsets[sel][:, None]
+            per_byte = 8 // bits
+            packed = data[offsets + element // per_byte]
+            unpacked = (packed >> (8 - bits - bits * (element % per_byte)).astype(np.uint8)) & ((1 << bits) - 1)
+            # Sentinel values are stored in extra bytes, after packed bytes
+            sentinel = unpacked == (1 << bits) - 1
+            rank = np.cumsum(sentinel, axis=1) - 1
+            extra = data[np.where(sentinel, offsets + 2 * bits + rank, 0)]
+            values[sel] = np.where(sentinel, extra, unpacked)
+
+        deltas = np.zeros((stride, count + 16), dtype=np.uint8)
+        deltas[np.array(group_channels)[:, None], np.array(group_vertices)[:, None] + element] = values
+        deltas = deltas[:, :count]
+
+        # Bytes are zigzag encoded deltas from previous vertex, first one from last vertex of tail
+        deltas = (deltas >> 1) ^ (np.uint8(0) - (deltas & 1))
+        deltas[:, 0] += data[len(src) - stride:]
+        return np.cumsum(deltas, axis=1, dtype=np.uint8).T.copy()
+
+    def decode_vbyte(self, src, pos):
+        lead = src[pos]
+        pos += 1
+        if lead < 128:
+            return lead, pos
+
+        result = lead & 127
+        shift = 7
+        for i in range(4):
+            group = src[pos]
+            pos += 1
+            result |= (group & 127) << shift
+            shift += 7
+            if group < 128:
+                break
+
+        return result & 0xffffffff, pos
+
+    def decode_index(self, src, pos, last):
+        v, pos = self.decode_vbyte(src, pos)
+        d = (v >> 1) ^ -(v & 1)
+        return (last + d) & 0xffffffff, pos
+
+    def decode_index_buffer(self):
+        src = bytes(self.source)
+        count = self.count
+
+        if count % 3 != 0 or self.stride not in [2, 4]:
+            raise ValueError("bad triangle buffer layout")
+
+        if len(src) < 1 + count // 3 + 16 or src[0] & 0xf0 != 0xe0:
+            raise ValueError("bad triangle buffer header")
+
+        version = src[0] & 0x0f
+        if version > 1:
+            raise ValueError("unsupported triangle buffer version " + str(version))
+
+        # Triangles are encoded with a code byte each, using FIFOs of recent edges and vertices
+        edge_fifo = [(0xffffffff, 0xffffffff)] * 16
+        vertex_fifo = [0xffffffff] * 16
+        edge_offset = 0
+        vertex_offset = 0
+        next_idx = 0
+        last = 0
+        fecmax = 13 if version >= 1 else 15
+
+        code = 1
+        pos = 1 + count // 3
+        data_end = len(src) - 16
+        codeaux_table = src[data_end:]
+
+        indices = np.empty(count, dtype=np.uint32)
+
+        for i in range(0, count, 3):
+            if pos > data_end:
+                raise ValueError("truncated triangle buffer")
+
+            codetri = src[code]
+            code += 1
+
+            if codetri < 0xf0:
+                fe = codetri >> 4
+                a, b = edge_fifo[(edge_offset - 1 - fe) & 15]
+                fec = codetri & 15
+
+                if fec < fecmax:
+                    if fec == 0:
+                        c = next_idx
+                        next_idx += 1
+                        vertex_fifo[vertex_offset] = c
+                        vertex_offset = (vertex_offset + 1) & 15
+                    else:
+                        c = vertex_fifo[(vertex_offset - 1 - fec) & 15]
+                        vertex_fifo[vertex_offset] = c
+                else:
+                    if fec != 15:
+                        c = last = (last + fec - (fec ^ 3)) & 0xffffffff
+                    else:
+                        c, pos = self.decode_index(src, pos, last)
+                        last = c
+                    vertex_fifo[vertex_offset] = c
+                    vertex_offset = (vertex_offset + 1) & 15
+
+                edge_fifo[edge_offset] = (c, b)
+                edge_fifo[(edge_offset + 1) & 15] = (a, c)
+                edge_offset = (edge_offset + 2) & 15
+
+            else:
+                if codetri < 0xfe:
+                    codeaux = codeaux_table[codetri & 15]
+                    fea = 0
+                else:
+                    codeaux = src[pos]
+                    pos += 1
+                    fea = 0 if codetri == 0xfe else 15
+                    if codeaux == 0:
+                        next_idx = 0
+
+                feb = codeaux >> 4
+                fec = codeaux & 15
+
+                if fea == 0:
+                    a = next_idx
+                    next_idx += 1
+                else:
+                    a = 0
+
+                if feb == 0:
+                    b = next_idx
+                    next_idx += 1
+                else:
+                    b = vertex_fifo[(vertex_offset - feb) & 15]
+
+                if fec == 0:
+                    c = next_idx
+                    next_idx += 1
+                else:
+                    c = vertex_fifo[(vertex_offset - fec) & 15]
+
+                # Free indices are delta encoded from last free index
+                if fea == 15:
+                    a, pos = self.decode_index(src, pos, last)
+                    last = a
+                if feb == 15:
+                    b, pos = self.decode_index(src, pos, last)
+                    last = b
+                if fec == 15:
+                    c, pos = self.decode_index(src, pos, last)
+                    last = c
+
+                vertex_fifo[vertex_offset] = a
+                vertex_offset = (vertex_offset + 1) & 15
+                vertex_fifo[vertex_offset] = b
+                vertex_offset = (vertex_offset + (feb == 0 or feb == 15)) & 15
+                vertex_fifo[vertex_offset] = c
+                vertex_offset = (vertex_offset + (fec == 0 or fec == 15)) & 15
+
+                edge_fifo[edge_offset] = (b, a)
+                edge_fifo[(edge_offset + 1) & 15] = (c, b)
+                edge_fifo[(edge_offset + 2) & 15] = (a, c)
+                edge_offset = (edge_offset + 3) & 15
+
+            indices[i]     = a
+            indices[i + 1] = b
+            indices[i + 2] = c
+
+        if pos != data_end:
+            raise ValueError("bad triangle buffer size")
+
+        return self.index_bytes(indices)
+
+    def decode_index_sequence(self):
+        src = np.frombuffer(self.source, dtype=np.uint8)
+        count = self.count
+
+        if self.stride not in [2, 4]:
+            raise ValueError("bad index sequence layout")
+
+        if len(src) < 1 + count + 4 or src[0] & 0xf0 != 0xd0:
+            raise ValueError("bad index sequence header")
+
+        if src[0] & 0x0f > 1:
+            raise ValueError("unsupported index sequence version " + str(src[0] & 0x0f))
+
+        # Each index is a vbyte, ended by a byte < 128
+        data = src[1:len(src) - 4]
+        ends = np.flatnonzero(data < 128)
+        if len(ends) != count or (count > 0 and ends[-1] != len(data) - 1):
+            raise ValueError("bad index sequence size")
+
+        starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+        shifts = (np.arange(len(data)) - np.repeat(starts, ends - starts + 1)) * 7
+        v = np.add.reduceat((data & 127).astype(np.uint64) << shifts.astype(np.uint64), starts) if count > 0 else np.zeros(0, dtype=np.uint64)
+        v = (v & 0xffffffff).astype(np.uint32)
+
+        # Low bit selects baseline, next_idx ones are a zigzag encoded delta from this baseline
+        baseline = v & 1
+        v >>= 1
+        deltas = (v >> 1) ^ (np.uint32(0) - (v & 1))
+
+        indices = np.empty(count, dtype=np.uint32)
+        for current in [0, 1]:
+            sel = baseline == current
+            indices[sel] = np.cumsum(deltas[sel], dtype=np.uint32)
+
+        return self.index_bytes(indices)
+
+    def index_bytes(self, indices):
+        if self.stride == 2:
+            indices = indices.astype('<u2')
+        else:
+            indices = indices.astype('<u4')
+        return indices.view(np.uint8).reshape(self.count, self.stride)
+
+    def filter_octahedral(self, data):
+        # data is a (count, stride) uint8 array, modified in place
+        if self.stride == 4:
+            dtype, max_value = np.dtype('<i1'), 127.0
+        elif self.stride == 8:
+            dtype, max_value = np.dtype('<i2'), 32767.0
+        else:
+            raise ValueError("bad octahedral filter stride")
+
+        v = data.view(dtype)
+        x = v[:, 0].astype(np.float32)
+        y = v[:, 1].astype(np.float32)
+        z = v[:, 2].astype(np.float32) - np.abs(x) - np.abs(y)
+
+        # Fixup octahedral coordinates for z < 0
+        t = np.minimum(z, 0.0)
+        x += np.where(x >= 0.0, t, -t)
+        y += np.where(y >= 0.0, t, -t)
+
+        s = np.float32(max_value) / np.sqrt(x * x + y * y + z * z)
+        v[:, 0] = self.round(x * s)
+        v[:, 1] = self.round(y * s)
+        v[:, 2] = self.round(z * s)
+
+    def filter_quaternion(self, data):
+        if self.stride != 8:
+            raise ValueError("bad quaternion filter stride")
+
+        v = data.view('<i2')
+        # Scale is stored in high bits of 4th component, index of max component in 2 low bits
+        ss = np.float32(1.0 / np.sqrt(2.0)) / (v[:, 3] | 3).astype(np.float32)
+        x = v[:, 0] * ss
+        y = v[:, 1] * ss
+        z = v[:, 2] * ss
+        w = np.sqrt(np.maximum(np.float32(1.0) - x * x - y * y - z * z, 0.0))
+
+        qc = (v[:, 3] & 3).astype(np.int64)
+        rows = np.arange(len(v))
+        components = [self.round(x * np.float32(32767.0)), self.round(y * np.float32(32767.0)), self.round(z * np.float32(32767.0)), self.round(w * np.float32(32767.0))]
+        v[rows, (qc + 1) & 3] = components[0]
+        v[rows, (qc + 2) & 3] = components[1]
+        v[rows, (qc + 3) & 3] = components[2]
+        v[rows, qc] = components[3]
+
+    def filter_exponential(self, data):
+        if self.stride % 4 != 0:
+            raise ValueError("bad exponential filter stride")
+
+        v = data.view('<i4')
+        # 24 bits signed mantissa, 8 bits signed exponent
+        m = (v << 8) >> 8
+        e = v >> 24
+        scale = ((e + 127).astype(np.uint32) << np.uint32(23)).view(np.float32)
+        with np.errstate(over='ignore'):
+            v[:] = (scale * m.astype(np.float32)).view(np.int32)
+
+    def round(self, x):
+        # Rounded signed float to int conversion
+        return np.trunc(x + np.where(x >= 0.0, np.float32(0.5), np.float32(-0.5))).astype(np.int32)
+
+    def debug_missing(self):
+        keys = [
+                'buffer',
+                'byteOffset',
+                'byteLength',
+                'byteStride',
+                'count',
+                'mode',
+                'filter'
+                ]
+
+        for key in self.json.keys():
+            if key not in keys:
+                self.gltf.log.debug("EXT_meshopt_compression MISSING " + key)
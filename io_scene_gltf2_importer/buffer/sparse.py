@@ -21,7 +21,7 @@
  * This development is done in strong collaboration with Airbus Defence & Space
  """
 
-import struct
+import numpy as np
 from .bufferview import *
 
 class Sparse():
@@ -41,13 +41,8 @@ class Sparse():
             self.indices_buffer.debug_missing()
 
             #TODO factorisation with accessor code ?
-            fmt_char = self.gltf.fmt_char_dict[self.json['indices']['componentType']]
-            component_size = struct.calcsize(fmt_char)
-
+            dtype = np.dtype('<' + self.gltf.fmt_char_dict[self.json['indices']['componentType']])
             component_nb = self.gltf.component_nb_dict['SCALAR']
-            fmt = '<' + (fmt_char * component_nb)
-
-            stride = struct.calcsize(fmt)
 
             # TODO data alignment stuff
 
@@ -56,7 +51,7 @@ class Sparse():
             else:
                 offset = 0
 
-            self.indices = self.indices_buffer.read_data(fmt, stride, self.count, offset)
+            self.indices = self.indices_buffer.read_data(dtype, component_nb, self.count, offset)[:, 0]
 
 
         if 'values' in self.json.keys():
@@ -66,13 +61,8 @@ class Sparse():
             self.bufferView.debug_missing()
 
             #TODO factorisation with accessor code ?
-            fmt_char = self.gltf.fmt_char_dict[self.component_type]
-            component_size = struct.calcsize(fmt_char)
-
+            dtype = np.dtype('<' + self.gltf.fmt_char_dict[self.component_type])
             component_nb = self.gltf.component_nb_dict[self.type]
-            fmt = '<' + (fmt_char * component_nb)
-
-            stride = struct.calcsize(fmt)
 
             # TODO data alignment stuff
 
@@ -81,7 +71,7 @@ class Sparse():
             else:
                 offset = 0
 
-            self.data = self.bufferView.read_data(fmt, stride, self.count, offset)
+            self.data = self.bufferView.read_data(dtype, component_nb, self.count, offset)
 
     def debug_missing(self):
         keys = [
@@ -22,6 +22,8 @@
  """
 
 import json
+import struct
+import fnmatch
 
 from ..scene import *
 from ..animation import *
@@ -40,7 +42,7 @@ class BlenderData():
 
 class glTFImporter():
 
-    def __init__(self, filename, loglevel):
+    def __init__(self, filename, loglevel, import_settings=None):
         self.filename = filename
         self.other_scenes = []
 
@@ -50,6 +52,18 @@ class glTFImporter():
         self.log = log.logger
         self.log_handler = log.hdlr
 
+        # Import options, default values
+        self.import_settings = {
+            'skin_max_influences': 0,
+            'skin_min_weight': 0.0,
+            'anim_resample': False,
+            'anim_reduce': False,
+            'anim_reduce_tolerance': 0.0001,
+            'anim_filter': None
+        }
+        if import_settings is not None:
+            self.import_settings.update(import_settings)
+
         self.buffers = {}
         self.materials = {}
         self.default_material = None
@@ -58,8 +72,17 @@ class glTFImporter():
         self.animations = {}
         self.meshes = {}
 
+        # Decoded accessors, shared (read only) by all users of same accessor
+        self.accessors = {}
+        self.accessor_cache_hits = 0
+        self.accessor_cache_misses = 0
+        self.decoded_bufferviews = {}
+
         self.extensions_managed = [
-            "KHR_materials_pbrSpecularGlossiness"
+            "KHR_materials_pbrSpecularGlossiness",
+            "KHR_mesh_quantization",
+            "KHR_texture_transform",
+            "EXT_meshopt_compression"
         ]
 
         self.load()
@@ -93,7 +116,7 @@ class glTFImporter():
 
         # json
         type, str_json, offset = self.load_chunk(offset)
-        self.json = json.loads(str_json.decode('utf-8'))
+        self.json = json.loads(bytes(str_json).decode('utf-8'))
 
         # binary data
         chunk_cpt = 0
@@ -116,17 +139,14 @@ class glTFImporter():
         return data_type, data, offset + 8 + data_length
 
     def load(self):
-        with open(self.filename, 'rb') as f:
-            self.content = f.read()
-
+        # File is mapped, chunks are memoryview slices on it (no copy)
+        self.content = Buffer.map_file(self.filename)
 
         self.is_glb_format = self.content[:4] == b'glTF'
 
         if not self.is_glb_format:
+            self.json = json.loads(bytes(self.content).decode('utf-8'))
             self.content = None
-            with open(self.filename, 'r') as f:
-                content = f.read()
-                self.json = json.loads(content)
 
         else:
             # Parsing glb file
@@ -192,6 +212,10 @@ class glTFImporter():
         if 'animations' in self.json.keys():
             anim_idx = 0
             for anim in self.json['animations']:
+                if not self.is_animation_selected(anim_idx):
+                    self.log.info("Animation " + str(anim_idx) + " skipped")
+                    anim_idx += 1
+                    continue
                 animation = Animation(anim_idx, self.json['animations'][anim_idx], self)
                 animation.read()
                 animation.debug_missing()
@@ -221,6 +245,46 @@ class glTFImporter():
             if node_id in scene.nodes.keys():
                 return scene.nodes[node_id]
 
+    def is_animation_selected(self, anim_idx):
+        # Filter is a list, or a comma separated string, of names, indices or name patterns
+        anim_filter = self.import_settings['anim_filter']
+        if not anim_filter:
+            return True
+        if isinstance(anim_filter, str):
+            anim_filter = anim_filter.split(',')
+
+        name = self.json['animations'][anim_idx].get('name')
+        for pattern in anim_filter:
+            pattern = str(pattern).strip()
+            if not pattern:
+                continue
+            if pattern == str(anim_idx):
+                return True
+            if name is not None and fnmatch.fnmatchcase(name, pattern):
+                return True
+
+        return False
+
+    def get_accessor(self, accessor_idx):
+        if accessor_idx in self.accessors.keys():
+            self.accessor_cache_hits += 1
+            return self.accessors[accessor_idx]
+
+        self.accessor_cache_misses += 1
+        accessor = Accessor(accessor_idx, self.json['accessors'][accessor_idx], self)
+        accessor.read()
+        accessor.debug_missing()
+        if accessor.data is not None:
+            accessor.data.flags.writeable = False
+        self.accessors[accessor_idx] = accessor
+
+        return accessor
+
+    def release_accessors(self):
+        self.log.info("Accessor cache: " + str(self.accessor_cache_hits) + " hits, " + str(self.accessor_cache_misses) + " misses")
+        self.accessors = {}
+        self.decoded_bufferviews = {}
+
     def is_node_joint(self, node_id):
         is_joint = False
         for skin in self.skins.values():
@@ -236,48 +300,6 @@ class glTFImporter():
         for scene in self.other_scenes:
             scene.blender_create()
 
-        # Armature correction
-        # Try to detect bone chains, and set bone lengths
-        # To detect if a bone is in a chain, we try to detect if a bone head is aligned
-        # with parent_bone :
-        ##          Parent bone defined a line (between head & tail)
-        ##          Bone head defined a point
-        ##          Calcul of distance between point and line
-        ##          If < threshold --> In a chain
-        ## Based on an idea of @Menithal, but added alignement detection to avoid some bad cases
-
-        threshold = 0.001
-        for armobj in [obj for obj in bpy.data.objects if obj.type == "ARMATURE"]:
-            bpy.context.scene.objects.active = armobj
-            armature = armobj.data
-            bpy.ops.object.mode_set(mode="EDIT")
-            for bone in armature.edit_bones:
-                if bone.parent is None:
-                    continue
-
-                parent = bone.parent
-
-                # case where 2 bones are aligned (not in chain, same head)
-                if (bone.head - parent.head).length < threshold:
-                    continue
-
-
-
-
-                u = (parent.tail - parent.head).normalized()
-                point = bone.head
-                distance = ((point - parent.head).cross(u)).length / u.length
-                if distance < threshold:
-                    save_parent_direction = (parent.tail - parent.head).normalized().copy()
-                    save_parent_tail = parent.tail.copy()
-                    parent.tail = bone.head
-
-                    # case where 2 bones are aligned (not in chain, same head)
-                    # bone is no more is same direction
-                    if (parent.tail - parent.head).normalized().dot(save_parent_direction) < 0.9:
-                        parent.tail = save_parent_tail
-
-
 
     def debug_missing(self):
         keys = [
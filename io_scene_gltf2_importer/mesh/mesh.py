@@ -22,7 +22,7 @@
  """
 
 import bpy
-import bmesh
+import numpy as np
 
 from .primitive import *
 from ..rig import *
@@ -36,6 +36,7 @@ class Mesh():
         self.target_weights = []
         self.name = None
         self.skin = None
+        self.skin_transform = None
 
 
     def read(self):
@@ -82,48 +83,87 @@ class Mesh():
             mesh_name = "Mesh_" + str(self.index)
 
         mesh = bpy.data.meshes.new(mesh_name)
-        verts = []
-        edges = []
-        faces = []
+
         for prim in self.primitives:
-            verts, edges, faces = prim.blender_create(verts, edges, faces)
+            prim.blender_create()
 
-        mesh.from_pydata(verts, edges, faces)
-        mesh.validate()
+        # All primitives are merged, indices are offset by vertices of previous primitives
+        vertices_lengths = [prim.vertices_length for prim in self.primitives]
+        indices_lengths  = [len(prim.indices) for prim in self.primitives]
+        vertex_offsets = np.cumsum([0] + vertices_lengths[:-1])
+
+        # Kept as base for shape keys
+        self.positions = np.concatenate([self.gltf.convert.locations(prim.attributes['POSITION']['result']) for prim in self.primitives])
+
+        # Quantized skinned mesh : dequantization transform is in inverse bind matrices
+        self.skin_transform = None
+        if self.skin and len([prim for prim in self.primitives if prim.attributes['POSITION']['accessor'].json['componentType'] != 5126]) > 0:
+            self.skin_transform = self.skin.get_dequantization_transform()
+            if self.skin_transform is None:
+                self.gltf.log.error("Quantized skinned mesh without inverse bind matrices, vertices are not dequantized")
+            else:
+                self.positions = self.positions.dot(self.skin_transform[0:3, 0:3].T) + self.skin_transform[0:3, 3]
+        # Kept for per loop data (vertex index of each loop)
+        self.indices = np.concatenate([prim.indices for prim in self.primitives]) + np.repeat(vertex_offsets, indices_lengths)
+
+        # TODO mode of primitive 4 for now.
+        mesh.vertices.add(len(self.positions))
+        mesh.vertices.foreach_set('co', self.positions.astype(np.float32).ravel())
+
+        mesh.loops.add(len(self.indices))
+        mesh.loops.foreach_set('vertex_index', self.indices.astype(np.int32))
+
+        nb_faces = len(self.indices) // 3
+        mesh.polygons.add(nb_faces)
+        mesh.polygons.foreach_set('loop_start', np.arange(0, 3 * nb_faces, 3, dtype=np.int32))
+        mesh.polygons.foreach_set('loop_total', np.full(nb_faces, 3, dtype=np.int32))
+
+        mesh.update(calc_edges=True)
 
         return mesh
 
     def blender_set_mesh(self, mesh, obj):
 
-        # Normals
-        offset = 0
+        # manage UV, one layer per TEXCOORD_n for all primitives
+        texcoords = []
         for prim in self.primitives:
-            offset = prim.blender_set_normals(mesh, offset)
+            for texcoord in [attr for attr in prim.attributes.keys() if attr[:9] == "TEXCOORD_"]:
+                prim.blender_texcoord[int(texcoord[9:])] = texcoord
+                if texcoord not in texcoords:
+                    texcoords.append(texcoord)
+
+        for texcoord in sorted(texcoords, key=lambda texcoord: int(texcoord[9:])):
+            prim_uvs = []
+            for prim in self.primitives:
+                if texcoord not in prim.attributes.keys():
+                    prim_uvs.append(np.zeros((prim.vertices_length, 2), dtype=np.float32))
+                    continue
 
-        mesh.update()
+                # Texture transform is baked in UVs (gltfpack stores TEXCOORD dequantization there)
+                texture_transform = prim.get_texture_transform(int(texcoord[9:]))
+                if texture_transform is not None:
+                    prim_uvs.append(prim.apply_texture_transform(prim.attributes[texcoord]['result'], texture_transform))
+                else:
+                    prim_uvs.append(prim.attributes[texcoord]['result'])
+            uvs = np.concatenate(prim_uvs)
 
-        # manage UV
-        offset = 0
-        for prim in self.primitives:
-            offset = prim.blender_set_UV(obj, mesh, offset)
+            loop_uvs = uvs[self.indices].astype(np.float32)
+            loop_uvs[:, 1] = 1.0 - loop_uvs[:, 1]
 
-        mesh.update()
+            mesh.uv_textures.new(texcoord)
+            mesh.uv_layers[texcoord].data.foreach_set('uv', loop_uvs.ravel())
 
         # Object and UV are now created, we can set UVMap into material
         for prim in self.primitives:
             prim.blender_set_UV_in_mat(obj)
 
-        # Assign materials to mesh
-        offset = 0
-        cpt_index_mat = 0
-        bm = bmesh.new()
-        bm.from_mesh(obj.data)
-        bm.faces.ensure_lookup_table()
+        # Assign materials to mesh, one slot per primitive
+        # Faces of each primitive are a contiguous range
         for prim in self.primitives:
-            offset, cpt_index_mat = prim.blender_assign_material(obj, bm, offset, cpt_index_mat)
+            obj.data.materials.append(bpy.data.materials[prim.mat.blender_material])
 
-        bm.to_mesh(obj.data)
-        bm.free()
+        material_indices = np.repeat(np.arange(len(self.primitives), dtype=np.int32), [prim.faces_length for prim in self.primitives])
+        mesh.polygons.foreach_set('material_index', material_indices)
 
         # Create shapekeys if needed
         max_shape_to_create = 0
@@ -137,57 +177,73 @@ class Mesh():
 
         for i in range(max_shape_to_create):
 
-            obj.shape_key_add("target_" + str(i))
-            offset_idx = 0
-            for prim in self.primitives:
-                if i >= len(prim.targets):
-                    continue
-
-                bm = bmesh.new()
-                bm.from_mesh(mesh)
+            # Targets are deltas on base positions (sparse targets are already applied)
+            # NORMAL deltas are not imported, as Blender computes shape key normals
+            deltas = np.concatenate([
+                self.gltf.convert.locations(prim.targets[i]['POSITION']['result'])
+                if i < len(prim.targets) and 'POSITION' in prim.targets[i].keys()
+                else np.zeros((prim.vertices_length, 3), dtype=np.float32)
+                for prim in self.primitives
+            ])
 
-                shape_layer = bm.verts.layers.shape[i+1]
+            if self.skin_transform is not None:
+                deltas = deltas.dot(self.skin_transform[0:3, 0:3].T)
 
-                for vert in bm.verts:
-                    if not vert.index in range(offset_idx, offset_idx + prim.vertices_length):
-                        continue
-                    shape = vert[shape_layer]
-                    co = self.gltf.convert.location(list(prim.targets[i]['POSITION']['result'][vert.index - offset_idx]))
-                    shape.x = obj.data.vertices[vert.index].co.x + co[0]
-                    shape.y = obj.data.vertices[vert.index].co.y + co[1]
-                    shape.z = obj.data.vertices[vert.index].co.z + co[2]
-
-                bm.to_mesh(obj.data)
-                bm.free()
-                offset_idx += prim.vertices_length
+            shape_key = obj.shape_key_add("target_" + str(i))
+            shape_key.data.foreach_set('co', (self.positions + deltas).astype(np.float32).ravel())
 
         # set default weights for shape keys, and names
         for i in range(max_shape_to_create):
             if i < len(self.target_weights):
                 obj.data.shape_keys.key_blocks[i+1].value = self.target_weights[i]
-                if self.primitives[0].targets[i]['POSITION']['accessor'].name:
+                if 'POSITION' in self.primitives[0].targets[i].keys() and self.primitives[0].targets[i]['POSITION']['accessor'].name:
                    obj.data.shape_keys.key_blocks[i+1].name  = self.primitives[0].targets[i]['POSITION']['accessor'].name
 
 
-        # Apply vertex color.
-        vertex_color = None
-        offset = 0
-        for prim in self.primitives:
-            if 'COLOR_0' in prim.attributes.keys():
-                # Create vertex color, once only per object
-                if vertex_color is None:
-                    vertex_color = obj.data.vertex_colors.new("COLOR_0")
-
-                color_data = prim.attributes['COLOR_0']['result']
-
-                for poly in mesh.polygons:
-                    for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                        vert_idx = mesh.loops[loop_idx].vertex_index
-                        if vert_idx in range(offset, offset + prim.vertices_length):
-                            cpt_idx = vert_idx - offset
-                            vertex_color.data[loop_idx].color = color_data[cpt_idx][0:3]
-                            #TODO : no alpha in vertex color
-            offset = offset + prim.vertices_length
+        # Apply vertex color, once for all primitives
+        if len([prim for prim in self.primitives if 'COLOR_0' in prim.attributes.keys()]) > 0:
+            colors = []
+            for prim in self.primitives:
+                if 'COLOR_0' in prim.attributes.keys():
+                    color_data = prim.attributes['COLOR_0']['result']
+                    if color_data.shape[1] == 3:
+                        color_data = np.hstack((color_data, np.ones((len(color_data), 1), dtype=np.float32)))
+                else:
+                    color_data = np.ones((prim.vertices_length, 4), dtype=np.float32)
+                colors.append(color_data)
+
+            loop_colors = np.concatenate(colors)[self.indices].astype(np.float32)
+
+            vertex_color = obj.data.vertex_colors.new("COLOR_0")
+            if len(vertex_color.data) > 0 and len(vertex_color.data[0].color) == 4:
+                vertex_color.data.foreach_set('color', loop_colors.ravel())
+            else:
+                # No alpha in vertex color, alpha is stored in another layer, if not opaque
+                vertex_color.data.foreach_set('color', loop_colors[:, 0:3].ravel())
+                if np.any(loop_colors[:, 3] != 1.0):
+                    vertex_alpha = obj.data.vertex_colors.new("COLOR_0_ALPHA")
+                    vertex_alpha.data.foreach_set('color', np.repeat(loop_colors[:, 3], 3))
+
+        # Check geometry once all data are set, as invalid faces may be removed
+        mesh.validate()
+
+        # Normals, set once for whole mesh as custom split normals
+        # Vertex normals are not used, as Blender recalculates them
+        if len([prim for prim in self.primitives if 'NORMAL' in prim.attributes.keys()]) > 0:
+            normals = np.concatenate([
+                prim.attributes['NORMAL']['result'] if 'NORMAL' in prim.attributes.keys()
+                else np.zeros((prim.vertices_length, 3), dtype=np.float32) # Zero normal : Blender auto normal
+                for prim in self.primitives
+            ])
+
+            # Normals go through inverse transpose of dequantization transform
+            if self.skin_transform is not None:
+                normals = normals.dot(np.linalg.inv(self.skin_transform[0:3, 0:3]))
+
+            mesh.polygons.foreach_set('use_smooth', np.ones(len(mesh.polygons), dtype=bool))
+            mesh.create_normals_split()
+            mesh.normals_split_custom_set_from_vertices(normals)
+            mesh.use_auto_smooth = True
 
     def debug_missing(self):
         keys = [
@@ -24,7 +24,7 @@
 from ..buffer import *
 from ..material import *
 
-from mathutils import Vector
+import numpy as np
 
 class Primitive():
     def __init__(self, index, json, gltf):
@@ -43,30 +43,22 @@ class Primitive():
             for attr in self.json['attributes'].keys():
                 self.gltf.log.debug("Primitive attribute " + attr)
                 self.attributes[attr] = {}
-                self.attributes[attr]['accessor'] = Accessor(self.json['attributes'][attr], self.gltf.json['accessors'][self.json['attributes'][attr]], self.gltf)
-                self.attributes[attr]['result']   = self.attributes[attr]['accessor'].read()
-                self.attributes[attr]['accessor'].debug_missing()
+                self.attributes[attr]['accessor'] = self.gltf.get_accessor(self.json['attributes'][attr])
 
-                # Convert data if needed
-                if attr in ['TEXCOORD_0', 'TEXCOORD_1', 'COLOR_0', 'WEIGHTS_0']:
-                    if self.attributes[attr]['accessor'].normalized == True:
-                        if self.attributes[attr]['accessor'].json['componentType'] == 5121:
-                            for idx_tab, i in enumerate(self.attributes[attr]['result']):
-                                new_tuple = ()
-                                for idx, it in enumerate(i):
-                                    new_tuple += (float(it/255.0),)
-                                self.attributes[attr]['result'][idx_tab] = new_tuple
+                # Joints are indices, all other attributes are converted to float
+                if attr[:7] == 'JOINTS_':
+                    self.attributes[attr]['result'] = self.attributes[attr]['accessor'].data
+                else:
+                    self.attributes[attr]['result'] = self.attributes[attr]['accessor'].dequantize()
 
 
         # reading indices
         if 'indices' in self.json.keys():
             self.gltf.log.debug("Primitive indices")
-            self.accessor = Accessor(self.json['indices'], self.gltf.json['accessors'][self.json['indices']], self.gltf)
-            self.indices  = self.accessor.read()
-            self.indices  = [ind[0] for ind in self.indices]
-            self.accessor.debug_missing()
+            self.accessor = self.gltf.get_accessor(self.json['indices'])
+            self.indices  = self.accessor.data[:, 0]
         else:
-            self.indices = range(0, len(self.attributes['POSITION']['result']))
+            self.indices = np.arange(len(self.attributes['POSITION']['result']))
 
 
         # reading materials
@@ -107,27 +99,14 @@ class Primitive():
                 target = {}
                 for attr in targ.keys():
                     target[attr] = {}
-                    target[attr]['accessor'] = Accessor(targ[attr], self.gltf.json['accessors'][targ[attr]], self.gltf)
-                    target[attr]['result']   = target[attr]['accessor'].read()
-                    target[attr]['accessor'].debug_missing()
+                    target[attr]['accessor'] = self.gltf.get_accessor(targ[attr])
+                    target[attr]['result']   = target[attr]['accessor'].dequantize()
                 self.targets.append(target)
 
 
-    def blender_create(self, verts, edges, faces):
-        # TODO mode of primitive 4 for now.
-        current_length = len(verts)
-        prim_verts = [self.gltf.convert.location(vert) for vert in self.attributes['POSITION']['result']]
-        self.vertices_length = len(prim_verts)
-        verts.extend(prim_verts)
-        prim_faces = []
-        for i in range(0, len(self.indices), 3):
-            vals = self.indices[i:i+3]
-            new_vals = []
-            for y in vals:
-                new_vals.append(y+current_length)
-            prim_faces.append(tuple(new_vals))
-        faces.extend(prim_faces)
-        self.faces_length = len(prim_faces)
+    def blender_create(self):
+        self.vertices_length = len(self.attributes['POSITION']['result'])
+        self.faces_length = len(self.indices) // 3
 
         # manage material of primitive
         if self.mat:
@@ -136,33 +115,55 @@ class Primitive():
             if not self.mat.blender_material:
                 self.mat.create_blender()
 
-        return verts, edges, faces
-
-    def blender_set_normals(self, mesh, offset):
-        if 'NORMAL' in self.attributes.keys():
-            for poly in mesh.polygons:
-                for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                    vert_idx = mesh.loops[loop_idx].vertex_index
-                    if vert_idx in range(offset, offset + self.vertices_length):
-                        cpt_vert = vert_idx - offset
-                        mesh.vertices[vert_idx].normal = self.attributes['NORMAL']['result'][cpt_vert]
-        offset = offset + self.vertices_length
-        return offset
-
-    def blender_set_UV(self, obj, mesh, offset):
-        for texcoord in [attr for attr in self.attributes.keys() if attr[:9] == "TEXCOORD_"]:
-            if not texcoord in mesh.uv_textures:
-                mesh.uv_textures.new(texcoord)
-                self.blender_texcoord[int(texcoord[9:])] = texcoord
-
-            for poly in mesh.polygons:
-                for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                    vert_idx = mesh.loops[loop_idx].vertex_index
-                    if vert_idx in range(offset, offset + self.vertices_length):
-                        obj.data.uv_layers[texcoord].data[loop_idx].uv = Vector((self.attributes[texcoord]['result'][vert_idx-offset][0], 1-self.attributes[texcoord]['result'][vert_idx-offset][1]))
-
-        offset = offset + self.vertices_length
-        return offset
+    def get_texture_transform(self, texcoord):
+        # KHR_texture_transform of material textures using TEXCOORD_<texcoord>
+        # (quantizers put TEXCOORD dequantization there). Returns (offset, rotation, scale) or None.
+        if 'material' not in self.json.keys():
+            return None
+
+        material = self.gltf.json['materials'][self.json['material']]
+        pbr = material.get('pbrMetallicRoughness', {})
+        specgloss = material.get('extensions', {}).get('KHR_materials_pbrSpecularGlossiness', {})
+        texture_infos = [
+            pbr.get('baseColorTexture'),
+            pbr.get('metallicRoughnessTexture'),
+            material.get('normalTexture'),
+            material.get('occlusionTexture'),
+            material.get('emissiveTexture'),
+            specgloss.get('diffuseTexture'),
+            specgloss.get('specularGlossinessTexture')
+        ]
+
+        transforms = []
+        for texture_info in [info for info in texture_infos if info is not None]:
+            transform = texture_info.get('extensions', {}).get('KHR_texture_transform', {})
+            if transform.get('texCoord', texture_info.get('texCoord', 0)) == texcoord:
+                transforms.append(transform)
+
+        if len([transform for transform in transforms if transform]) == 0:
+            return None
+
+        # Transform is baked in UVs, so it must be the same for all textures
+        keys = [('offset', [0.0, 0.0]), ('rotation', 0.0), ('scale', [1.0, 1.0])]
+        offset, rotation, scale = [transforms[0].get(key, default) for key, default in keys]
+        for transform in transforms[1:]:
+            if [transform.get(key, default) for key, default in keys] != [offset, rotation, scale]:
+                self.gltf.log.error("KHR_texture_transform differs between textures using TEXCOORD_" + str(texcoord) + ", not applied")
+                return None
+
+        return np.array(offset, dtype=np.float32), rotation, np.array(scale, dtype=np.float32)
+
+    def apply_texture_transform(self, uvs, texture_transform):
+        # uv' = T * R * S * uv, as defined by KHR_texture_transform
+        offset, rotation, scale = texture_transform
+        uvs = uvs * scale
+        if rotation != 0.0:
+            cos, sin = np.cos(rotation), np.sin(rotation)
+            uvs = np.stack((
+                cos * uvs[:, 0] + sin * uvs[:, 1],
+                -sin * uvs[:, 0] + cos * uvs[:, 1]
+            ), axis=1)
+        return uvs + offset
 
     def blender_set_UV_in_mat(self, obj):
         if hasattr(self.mat, "KHR_materials_pbrSpecularGlossiness"):
@@ -179,17 +180,6 @@ class Primitive():
                 if self.mat.pbr.metallic_type in [self.mat.pbr.TEXTURE, self.mat.pbr.TEXTURE_FACTOR] :
                     self.mat.set_uvmap(self, obj)
 
-    def blender_assign_material(self, obj, bm, offset, cpt_index_mat):
-        obj.data.materials.append(bpy.data.materials[self.mat.blender_material])
-        for vert in bm.verts:
-            if vert.index in range(offset, offset + self.vertices_length):
-                for loop in vert.link_loops:
-                    face = loop.face.index
-                    bm.faces[face].material_index = cpt_index_mat
-        cpt_index_mat += 1
-        offset = offset + self.vertices_length
-        return offset, cpt_index_mat
-
     def debug_missing(self):
         keys = [
                 'indices',
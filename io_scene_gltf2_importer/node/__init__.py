@@ -110,45 +110,29 @@ class Node():
 
 
     def set_transforms(self, obj, parent):
-        if parent is None:
-            obj.matrix_world =  self.transform
-            return
-
-        for node in self.gltf.scene.nodes.values(): # TODO if parent is in another scene
-            if node.index == parent:
-                if node.is_joint == True:
-                    obj.matrix_world = self.transform
-                    return
-                else:
-                    obj.matrix_world = self.transform
-                    return
-
-
+        # Same for all parent types : transform is local to parent (or to parent bone)
+        obj.matrix_world = self.transform
 
     def set_blender_parent(self, obj, parent):
 
         if parent is None:
             return
 
-        for node in self.gltf.scene.nodes.values(): # TODO if parent is in another scene
-            if node.index == parent:
-                if node.is_joint == True:
-                    bpy.ops.object.select_all(action='DESELECT')
-                    bpy.data.objects[node.blender_armature_name].select = True
-                    bpy.context.scene.objects.active = bpy.data.objects[node.blender_armature_name]
-                    bpy.ops.object.mode_set(mode='EDIT')
-                    bpy.data.objects[node.blender_armature_name].data.edit_bones.active = bpy.data.objects[node.blender_armature_name].data.edit_bones[node.blender_bone_name]
-                    bpy.ops.object.mode_set(mode='OBJECT')
-                    bpy.ops.object.select_all(action='DESELECT')
-                    obj.select = True
-                    bpy.data.objects[node.blender_armature_name].select = True
-                    bpy.context.scene.objects.active = bpy.data.objects[node.blender_armature_name]
-                    bpy.ops.object.parent_set(type='BONE', keep_transform=True)
-
-                    return
-                if node.blender_object:
-                    obj.parent = bpy.data.objects[node.blender_object]
-                    return
+        if parent in self.gltf.scene.nodes.keys(): # TODO if parent is in another scene
+            node = self.gltf.scene.nodes[parent]
+            if node.is_joint == True:
+                # Parenting through data only, without operators
+                armature = bpy.data.objects[node.blender_armature_name]
+                obj.parent = armature
+                obj.parent_type = 'BONE'
+                obj.parent_bone = node.blender_bone_name
+                # Bone parenting is relative to bone tail, put it back on bone head
+                obj.matrix_parent_inverse = Matrix.Translation(Vector((0.0, -armature.data.bones[node.blender_bone_name].length, 0.0)))
+
+                return
+            if node.blender_object:
+                obj.parent = bpy.data.objects[node.blender_object]
+                return
 
         self.gltf.log.error("ERROR, parent not found")
 
@@ -211,7 +195,9 @@ class Node():
             if self.gltf.skins[self.skin_id].blender_armature_name is None:
                 self.gltf.skins[self.skin_id].create_blender_armature(parent)
 
-            self.gltf.skins[self.skin_id].create_bone(self, parent)
+            # Whole armature is created with its first bone
+            if not hasattr(self, "blender_bone_name"):
+                self.gltf.skins[self.skin_id].create_bones()
 
             for child in self.children:
                 child.blender_create(self.index)
@@ -22,8 +22,10 @@
  """
 
 import bpy
+import numpy as np
 from mathutils import Vector, Matrix, Quaternion
 from ..buffer import *
+from .nodetree import *
 
 class Skin():
     def __init__(self, index, json, gltf):
@@ -35,6 +37,7 @@ class Skin():
         self.blender_armature_name = None
         self.mesh_id = None
         self.root = None
+        self.node_tree = None
 
     def read(self):
         if 'skeleton' in self.json.keys():
@@ -47,9 +50,21 @@ class Skin():
             self.name = self.json['name']
 
         if 'inverseBindMatrices' in self.json.keys():
-            self.inverseBindMatrices = Accessor(self.json['inverseBindMatrices'], self.gltf.json['accessors'][self.json['inverseBindMatrices']], self.gltf)
-            self.data = self.inverseBindMatrices.read()
-            self.inverseBindMatrices.debug_missing()
+            self.inverseBindMatrices = self.gltf.get_accessor(self.json['inverseBindMatrices'])
+            self.data = self.inverseBindMatrices.data
+
+    def get_node_tree(self):
+        # Built once, shared by all node hierarchy lookups
+        if self.node_tree is None:
+            self.node_tree = NodeTree(self.gltf.json['nodes'])
+        return self.node_tree
+
+    def get_dequantization_transform(self):
+        # Dequantization of skinned quantized meshes is in inverse bind matrices
+        if not hasattr(self, "inverseBindMatrices") or len(self.bones) == 0:
+            return None
+
+        return self.get_node_tree().skin_dequantization(self.bones[0], self.data[0])
 
     def create_blender_armature(self, parent):
         if self.name is not None:
@@ -65,59 +80,106 @@ class Skin():
             obj.parent = bpy.data.objects[self.gltf.scene.nodes[parent].blender_object]
 
 
-    def set_bone_transforms(self, bone, node, parent):
-        obj   = bpy.data.objects[self.blender_armature_name]
+    def get_bone_joints(self):
+        # Joint nodes of this skin, parents before children, with their parent node
+        parents = self.get_node_tree().parents
+
+        joints = set([node.index for node in self.gltf.scene.nodes.values() if node.is_joint and node.skin_id == self.index])
 
-        mat = Matrix()
+        ordered = []
+        to_visit = [joint for joint in sorted(joints) if parents.get(joint) not in joints]
+        while len(to_visit) > 0:
+            joint = to_visit.pop(0)
+            ordered.append((self.gltf.scene.nodes[joint], parents.get(joint) if parents.get(joint) in joints else None))
+            to_visit.extend([child.index for child in self.gltf.scene.nodes[joint].children if child.index in joints])
+
+        return ordered
+
+    def set_bone_transforms(self, node, parent):
+        transform = node.get_transforms()
         if parent is None:
-            transform = node.get_transforms()
             mat = transform
         else:
-            if not self.gltf.scene.nodes[parent].is_joint: # TODO if Node in another scene
-                transform  = node.get_transforms()
-                mat = transform
-
-            else:
-                transform = node.get_transforms()
-                parent_mat = obj.data.edit_bones[self.gltf.scene.nodes[parent].blender_bone_name].matrix # Node in another scene
+            parent_mat = self.gltf.scene.nodes[parent].blender_bone_matrix
 
-                mat = (parent_mat.to_quaternion() * transform.to_quaternion()).to_matrix().to_4x4()
-                mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * transform.to_translation() ) ) * mat
+            mat = (parent_mat.to_quaternion() * transform.to_quaternion()).to_matrix().to_4x4()
+            mat = Matrix.Translation(parent_mat.to_translation() + ( parent_mat.to_quaternion() * transform.to_translation() ) ) * mat
 
-        bone.matrix = mat
-        return bone.matrix
+        # Edit bones have no scale
+        node.blender_bone_matrix = Matrix.Translation(mat.to_translation()) * mat.to_quaternion().to_matrix().to_4x4()
 
-    def create_bone(self, node, parent):
+    def create_bones(self):
         scene = bpy.data.scenes[self.gltf.blender.scene]
         obj   = bpy.data.objects[self.blender_armature_name]
 
-        bpy.context.screen.scene = scene
-        scene.objects.active = obj
-        bpy.ops.object.mode_set(mode="EDIT")
-
-        if node.name:
-            name = node.name
-        else:
-            name = "Bone_" + str(node.index)
-
-        bone = obj.data.edit_bones.new(name)
-        node.blender_bone_name = bone.name
-        node.blender_armature_name = self.blender_armature_name
-        if parent is not None and not self.gltf.scene.nodes[parent].is_joint: # For root bone
-            parent_scale = bpy.data.objects[self.gltf.scene.nodes[parent].blender_object].matrix_world.to_scale()
-            self.blender_armature_scale = 1.0/parent_scale[1]
-            bone.tail = Vector((0.0,self.blender_armature_scale,0.0)) # Needed to keep bone alive, and set scale
-        else:
-            bone.tail = Vector((0.0,self.blender_armature_scale,0.0)) # Needed to keep bone alive
-        bone.tail = Vector((0.0,1.0,0.0)) # Disable scaling for now
-        mat = self.set_bone_transforms(bone, node, parent)
-        node.blender_bone_matrix = mat
+        # Bone matrices are computed from node tree before entering edit mode
+        joints = self.get_bone_joints()
+        for node, parent in joints:
+            self.set_bone_transforms(node, parent)
 
-        # Set parent
-        if parent is not None and hasattr(self.gltf.scene.nodes[parent], "blender_bone_name"):
-            bone.parent = obj.data.edit_bones[self.gltf.scene.nodes[parent].blender_bone_name] #TODO if in another scene
+        # All bones of armature are created in a single edit mode session
+        # Context is overridden, so no screen is needed (background mode)
+        scene.objects.active = obj
+        context = {'scene': scene, 'active_object': obj, 'object': obj}
+        bpy.ops.object.mode_set(context, mode="EDIT")
 
-        bpy.ops.object.mode_set(mode="OBJECT")
+        edit_bones = {}
+        for node, parent in joints:
+            if node.name:
+                name = node.name
+            else:
+                name = "Bone_" + str(node.index)
+
+            bone = obj.data.edit_bones.new(name)
+            node.blender_bone_name = bone.name
+            node.blender_armature_name = self.blender_armature_name
+            bone.tail = Vector((0.0,1.0,0.0)) # Needed to keep bone alive. Disable scaling for now
+            bone.matrix = node.blender_bone_matrix
+
+            # Set parent
+            if parent is not None:
+                bone.parent = edit_bones[parent]
+
+            edit_bones[node.index] = bone
+
+        self.set_bone_lengths(obj.data)
+
+        bpy.ops.object.mode_set(context, mode="OBJECT")
+
+    def set_bone_lengths(self, armature):
+        # Armature correction
+        # Try to detect bone chains, and set bone lengths
+        # To detect if a bone is in a chain, we try to detect if a bone head is aligned
+        # with parent_bone :
+        ##          Parent bone defined a line (between head & tail)
+        ##          Bone head defined a point
+        ##          Calcul of distance between point and line
+        ##          If < threshold --> In a chain
+        ## Based on an idea of @Menithal, but added alignement detection to avoid some bad cases
+
+        threshold = 0.001
+        for bone in armature.edit_bones:
+            if bone.parent is None:
+                continue
+
+            parent = bone.parent
+
+            # case where 2 bones are aligned (not in chain, same head)
+            if (bone.head - parent.head).length < threshold:
+                continue
+
+            u = (parent.tail - parent.head).normalized()
+            point = bone.head
+            distance = ((point - parent.head).cross(u)).length / u.length
+            if distance < threshold:
+                save_parent_direction = (parent.tail - parent.head).normalized().copy()
+                save_parent_tail = parent.tail.copy()
+                parent.tail = bone.head
+
+                # case where 2 bones are aligned (not in chain, same head)
+                # bone is no more is same direction
+                if (parent.tail - parent.head).normalized().dot(save_parent_direction) < 0.9:
+                    parent.tail = save_parent_tail
 
     def create_vertex_groups(self):
         obj = bpy.data.objects[self.gltf.scene.nodes[self.mesh_id].blender_object]
@@ -128,49 +190,98 @@ class Skin():
         node = self.gltf.scene.nodes[self.mesh_id]
         obj = bpy.data.objects[node.blender_object]
 
+        # Vertex groups, in joints order
+        groups = [obj.vertex_groups[self.gltf.scene.nodes[bone].blender_bone_name] for bone in self.bones]
+
+        joints   = []
+        weights  = []
+        vertices = []
         offset = 0
         for prim in node.mesh.primitives:
-            idx_already_done = {}
-
-            if 'JOINTS_0' in prim.attributes.keys() and 'WEIGHTS_0' in prim.attributes.keys():
 
-                joint_ = prim.attributes['JOINTS_0']['result']
-                weight_ = prim.attributes['WEIGHTS_0']['result']
+            # Merge all JOINTS_n / WEIGHTS_n sets
+            set_idx = 0
+            joint_sets = []
+            weight_sets = []
+            while 'JOINTS_' + str(set_idx) in prim.attributes.keys() and 'WEIGHTS_' + str(set_idx) in prim.attributes.keys():
+                joint_sets.append(prim.attributes['JOINTS_' + str(set_idx)]['result'])
+                weight_sets.append(prim.attributes['WEIGHTS_' + str(set_idx)]['result'])
+                set_idx += 1
 
-                for poly in obj.data.polygons:
-                    for loop_idx in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                        vert_idx = obj.data.loops[loop_idx].vertex_index
+            if set_idx > 0:
 
-                        if vert_idx in idx_already_done.keys():
-                            continue
-                        idx_already_done[vert_idx] = True
+                joint_ = np.hstack(joint_sets)
+                weight_ = self.prune_weights(np.hstack(weight_sets))
 
-                        if vert_idx in range(offset, offset + prim.vertices_length):
-
-                            tab_index = vert_idx - offset
-                            cpt = 0
-                            for joint_idx in joint_[tab_index]:
-                                weight_val = weight_[tab_index][cpt]
-                                if weight_val != 0.0:   # It can be a problem to assign weights of 0
-                                                        # for bone index 0, if there is always 4 indices in joint_ tuple
-                                    group = obj.vertex_groups[self.gltf.scene.nodes[self.bones[joint_idx]].blender_bone_name]
-                                    group.add([vert_idx], weight_val, 'REPLACE')
-                                cpt += 1
+                joints.append(joint_.ravel())
+                weights.append(weight_.ravel())
+                vertices.append(np.repeat(np.arange(offset, offset + prim.vertices_length), joint_.shape[1]))
             else:
                 self.gltf.log.error("No Skinning ?????") #TODO
 
 
             offset = offset + prim.vertices_length
 
+        if len(joints) == 0:
+            return
+
+        joints   = np.concatenate(joints)
+        weights  = np.concatenate(weights)
+        vertices = np.concatenate(vertices)
+
+        # It can be a problem to assign weights of 0
+        # for bone index 0, if there is always 4 indices in joint_ tuple
+        influences = weights != 0.0
+        joints   = joints[influences]
+        weights  = weights[influences]
+        vertices = vertices[influences]
+
+        if len(joints) == 0:
+            return
+
+        # Sort influences by joint then weight, and add each (joint, weight) bucket at once
+        order = np.lexsort((weights, joints))
+        joints   = joints[order]
+        weights  = weights[order]
+        vertices = vertices[order]
+
+        limits = np.flatnonzero((joints[1:] != joints[:-1]) | (weights[1:] != weights[:-1])) + 1
+        starts = np.concatenate(([0], limits))
+        ends   = np.concatenate((limits, [len(joints)]))
+        for start, end in zip(starts, ends):
+            groups[joints[start]].add(vertices[start:end].tolist(), float(weights[start]), 'REPLACE')
+
+    def prune_weights(self, weights):
+        # weights is a (vertices, influences) array, modified in place
+        max_influences = self.gltf.import_settings['skin_max_influences']
+        min_weight     = self.gltf.import_settings['skin_min_weight']
+
+        if min_weight <= 0.0 and (max_influences <= 0 or weights.shape[1] <= max_influences):
+            return weights
+
+        rows = np.arange(len(weights))
+        heaviest = np.argmax(weights, axis=1)
+        heaviest_weights = weights[rows, heaviest]
+
+        weights[weights < min_weight] = 0.0
+
+        # Keep only heaviest influences of each vertex
+        if max_influences > 0 and weights.shape[1] > max_influences:
+            lightest = np.argsort(-weights, axis=1, kind='mergesort')[:, max_influences:]
+            weights[rows[:, None], lightest] = 0.0
+
+        # Heaviest influence is always kept, so that no vertex stops deforming
+        weights[rows, heaviest] = heaviest_weights
+
+        totals = weights.sum(axis=1)
+        weights[totals > 0.0] /= totals[totals > 0.0][:, None]
+
+        return weights
+
     def create_armature_modifiers(self):
         node = self.gltf.scene.nodes[self.mesh_id]
         obj = bpy.data.objects[node.blender_object]
 
-        for obj_sel in bpy.context.scene.objects:
-            obj_sel.select = False
-        obj.select = True
-        bpy.context.scene.objects.active = obj
-
         #bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
         #obj.parent = bpy.data.objects[self.blender_armature_name]
         arma = obj.modifiers.new(name="Armature", type="ARMATURE")
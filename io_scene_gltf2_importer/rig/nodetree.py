@@ -0,0 +1,79 @@
+"""
+ * ***** BEGIN GPL LICENSE BLOCK *****
+ *
+ * This program is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU General Public License
+ * as published by the Free Software Foundation; either version 2
+ * of the License, or (at your option) any later version.
+ *
+ * This program is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with this program; if not, write to the Free Software Foundation,
+ * Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+ *
+ * Contributor(s): Julien Duroure.
+ *
+ * ***** END GPL LICENSE BLOCK *****
+ * This development is done in strong collaboration with Airbus Defence & Space
+ """
+
+import numpy as np
+
+class NodeTree():
+    """Node hierarchy of glTF file, from json only, with glTF matrices as NumPy arrays."""
+
+    def __init__(self, nodes_json):
+        self.nodes = nodes_json # Nodes json
+
+        # Parent node of each child node
+        self.parents = {}
+        for index, node in enumerate(self.nodes):
+            if 'children' in node.keys():
+                for child in node['children']:
+                    self.parents[child] = index
+
+    def local_matrix(self, index):
+        node = self.nodes[index]
+
+        if 'matrix' in node.keys():
+            # Column major
+            return np.array(node['matrix'], dtype=np.float64).reshape(4, 4).T
+
+        mat = np.identity(4)
+
+        if 'scale' in node.keys():
+            mat[0:3, 0:3] = np.diag(node['scale'])
+
+        if 'rotation' in node.keys():
+            x, y, z, w = node['rotation']
+            rotation = np.array([
+                [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+                [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+                [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)]
+            ])
+            mat[0:3, 0:3] = rotation.dot(mat[0:3, 0:3])
+
+        if 'translation' in node.keys():
+            mat[0:3, 3] = node['translation']
+
+        return mat
+
+    def world_matrix(self, index):
+        # All ancestors, up to scene root, joints or not
+        mat = self.local_matrix(index)
+        while index in self.parents.keys():
+            index = self.parents[index]
+            mat = self.local_matrix(index).dot(mat)
+
+        return mat
+
+    def skin_dequantization(self, joint, inverse_bind_matrix):
+        # Quantizers (KHR_mesh_quantization) put dequantization D of skinned meshes in inverse
+        # bind matrices, computed from world space : IBM = inverse(world joint) * D.
+        # Bind pose being node pose, D = world joint * IBM.
+        inverse_bind_matrix = np.array(inverse_bind_matrix, dtype=np.float64).reshape(4, 4).T
+        return self.world_matrix(joint).dot(inverse_bind_matrix)
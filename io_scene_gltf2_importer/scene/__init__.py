@@ -103,6 +103,12 @@ class Scene():
         for node in self.root_nodes_idx:
                 self.nodes[node].animation.blender_anim()
 
+        # Actions are written, push them to NLA tracks, in animation order
+        # Only first imported animation plays, on all objects
+        anim_indices = sorted(self.gltf.animations.keys())
+        for anim_idx in anim_indices:
+            self.gltf.animations[anim_idx].blender_push_nla(anim_idx != anim_indices[0])
+
 
         # Parent root node to rotation object
         bpy.data.scenes[self.gltf.blender.scene].objects.link(obj_rotation)
@@ -58,3 +58,15 @@ class Conversion():
 
     def scale(self, scale):
         return scale
+
+    # Array versions, on (count, components) arrays
+
+    def locations(self, locations):
+        return locations[:, 0:3]
+
+    def quaternions(self, quaternions):
+        # glTF is x, y, z, w ; Blender is w, x, y, z
+        return quaternions[:, [3, 0, 1, 2]]
+
+    def scales(self, scales):
+        return scales
@@ -0,0 +1,19 @@
+import os
+import sys
+import types
+
+# The add-on __init__ registers Blender operators and needs bpy, as do
+# __init__ of some subpackages. Register these packages without running them,
+# so that Blender independent modules (buffer, rig.nodetree,
+# animation.reduction, ...) can be imported in tests.
+ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "io_scene_gltf2_importer")
+
+for name, path in [
+        ("io_scene_gltf2_importer", ROOT),
+        ("io_scene_gltf2_importer.rig", os.path.join(ROOT, "rig")),
+        ("io_scene_gltf2_importer.animation", os.path.join(ROOT, "animation"))
+        ]:
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [path]
+        sys.modules[name] = package
@@ -0,0 +1,68 @@
+"""
+Generates meshopt.npz, reference-encoded EXT_meshopt_compression streams.
+
+Needs the meshoptimizer Python package (tested with 0.2.30a0):
+    python tests/fixtures/make_meshopt_fixtures.py
+"""
+
+import os
+import numpy as np
+import meshoptimizer as mo
+
+rng = np.random.default_rng(2024)
+fixtures = {}
+
+def add(name, encoded, expected, count, stride, mode, filter="NONE"):
+    fixtures[name + "/encoded"]  = np.frombuffer(bytes(encoded), dtype=np.uint8)
+    fixtures[name + "/expected"] = np.frombuffer(np.ascontiguousarray(expected).tobytes(), dtype=np.uint8)
+    fixtures[name + "/params"]   = np.array([count, stride, mode, filter])
+
+# ATTRIBUTES
+mo.encode_vertex_version(0)
+raw = rng.integers(0, 256, size=(17, 8), dtype=np.uint8)
+add("attributes_random", mo.encode_vertex_buffer(raw, 17, 8), raw, 17, 8, "ATTRIBUTES")
+smooth = np.cumsum(rng.integers(0, 3, size=(300, 12)), axis=0).astype(np.uint8)
+add("attributes_smooth", mo.encode_vertex_buffer(smooth, 300, 12), smooth, 300, 12, "ATTRIBUTES")
+positions = (rng.random((100, 3)) * 100).astype(np.float32)
+add("attributes_positions", mo.encode_vertex_buffer(positions, 100, 12), positions, 100, 12, "ATTRIBUTES")
+
+# TRIANGLES, expected is reference decoder output (encoder may rotate triangles)
+for version in [0, 1]:
+    mo.encode_index_version(version)
+    indices = rng.integers(0, 150, size=300).astype(np.uint32)
+    optimized = np.zeros_like(indices)
+    mo.optimize_vertex_cache(optimized, indices, 300, 150)
+    encoded = mo.encode_index_buffer(optimized, 300, 150)
+    decoded = np.asarray(mo.decode_index_buffer(300, 4, bytes(encoded))).view('<u4')
+    add("triangles_v%d_32" % version, encoded, decoded, 300, 4, "TRIANGLES")
+    add("triangles_v%d_16" % version, encoded, decoded.astype('<u2'), 300, 2, "TRIANGLES")
+
+# INDICES
+sequence = rng.integers(0, 1 << 20, size=200).astype(np.uint32)
+add("indices", mo.encode_index_sequence(sequence, 200, 1 << 20), sequence, 200, 4, "INDICES")
+
+# Filters, expected is reference filter output on raw data
+for stride, bits, dtype in [(4, 8, '<i1'), (8, 16, '<i2')]:
+    # Valid octahedral encoded normals
+    normals = rng.normal(size=(64, 3))
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    s = 1.0 / np.abs(normals).sum(axis=1)
+    x, y = normals[:, 0] * s, normals[:, 1] * s
+    negative = normals[:, 2] < 0
+    x, y = np.where(negative, (1 - np.abs(y)) * np.sign(x), x), np.where(negative, (1 - np.abs(x)) * np.sign(y), y)
+    max_value = (1 << (bits - 1)) - 1
+    raw = np.stack([np.round(x * max_value), np.round(y * max_value), np.full(64, max_value), rng.integers(-max_value, max_value, 64)], 1).astype(dtype)
+    raw = raw.view(np.uint8).reshape(64, stride)
+    expected = np.asarray(mo.decode_filter_oct(raw.copy().ravel(), 64, stride)).view(np.uint8)
+    add("octahedral_%d" % bits, mo.encode_vertex_buffer(raw, 64, stride), expected, 64, stride, "ATTRIBUTES", "OCTAHEDRAL")
+
+raw = rng.integers(0, 256, size=(64, 8), dtype=np.uint8)
+expected = np.asarray(mo.decode_filter_quat(raw.copy().ravel(), 64, 8)).view(np.uint8)
+add("quaternion", mo.encode_vertex_buffer(raw, 64, 8), expected, 64, 8, "ATTRIBUTES", "QUATERNION")
+
+raw = rng.integers(0, 256, size=(64, 12), dtype=np.uint8)
+raw[:, 3::4] = rng.integers(-20, 20, size=(64, 3)).astype(np.int8).view(np.uint8) # Sane exponents
+expected = np.asarray(mo.decode_filter_exp(raw.copy().ravel(), 64, 12)).view(np.uint8)
+add("exponential", mo.encode_vertex_buffer(raw, 64, 12), expected, 64, 12, "ATTRIBUTES", "EXPONENTIAL")
+
+np.savez_compressed(os.path.join(os.path.dirname(os.path.abspath(__file__)), "meshopt.npz"), **fixtures)
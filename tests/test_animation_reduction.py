@@ -0,0 +1,81 @@
+import logging
+import types
+
+import numpy as np
+
+from io_scene_gltf2_importer.animation.reduction import Reduction
+
+
+def reduction(tolerance):
+    gltf = types.SimpleNamespace(
+        import_settings={'anim_reduce_tolerance': tolerance},
+        log=logging.getLogger("glTFImporter")
+    )
+    return Reduction(gltf)
+
+
+def linear(times, values, at):
+    return np.stack([np.interp(at, times, values[:, i]) for i in range(values.shape[1])], axis=1)
+
+
+def test_sine_within_tolerance():
+    tolerance = 0.01
+    times = np.arange(0, 241) / 24.0
+    values = np.stack((np.sin(times), np.cos(2.0 * times), 0.5 * times), axis=1)
+
+    reduced_times, reduced_values = reduction(tolerance).reduce(times, values, "LINEAR")
+
+    assert len(reduced_times) < len(times) // 2
+    assert reduced_times[0] == times[0] and reduced_times[-1] == times[-1]
+    # Kept keys are original keys, and remaining interpolation matches all original keys
+    assert np.all(np.isin(reduced_times, times))
+    assert np.max(np.abs(linear(reduced_times, reduced_values, times) - values)) <= tolerance
+
+
+def test_rotation_within_tolerance():
+    tolerance = 0.001
+    times = np.arange(0, 49) / 24.0
+    angles = np.sin(times) # Non uniform angular speed, around Z
+    values = np.stack((np.zeros(len(times)), np.zeros(len(times)), np.sin(angles / 2.0), np.cos(angles / 2.0)), axis=1)
+    # Quaternion sign flips must not matter
+    values[1::2] *= -1.0
+
+    reduced_times, reduced_values = reduction(tolerance).reduce(times, values, "LINEAR", rotation=True)
+
+    assert len(reduced_times) < len(times)
+    reduced_angles = 2.0 * np.arctan2(reduced_values[:, 2], reduced_values[:, 3])
+    reduced_angles = np.arctan2(np.sin(reduced_angles), np.cos(reduced_angles))
+    assert np.max(np.abs(np.interp(times, reduced_times, reduced_angles) - angles)) <= tolerance * 1.01
+
+
+def test_step_keys_preserved():
+    times = np.array([0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+    values = np.array([[0.0], [0.0], [1.0], [1.0], [1.0], [3.0]])
+
+    reduced_times, reduced_values = reduction(0.0001).reduce(times, values, "STEP")
+
+    # Only repeated values are removed, every value change stays on its exact time
+    assert np.array_equal(reduced_times, [0.0, 2.0, 5.0])
+    assert np.array_equal(reduced_values, [[0.0], [1.0], [3.0]])
+    steps = np.searchsorted(reduced_times, times, side='right') - 1
+    assert np.array_equal(reduced_values[steps], values)
+
+
+def test_constant_channel_single_key():
+    times = np.linspace(0.0, 2.0, 30)
+    values = np.tile([1.0, 2.0, 3.0], (30, 1))
+    values[7, 1] += 0.00001
+
+    for interpolation in ["LINEAR", "STEP"]:
+        reduced_times, reduced_values = reduction(0.0001).reduce(times, values, interpolation)
+        assert np.array_equal(reduced_times, [0.0])
+        assert np.array_equal(reduced_values, values[0:1])
+
+
+def test_cubicspline_unchanged():
+    times = np.array([0.0, 1.0, 2.0])
+    values = np.zeros((9, 1))
+
+    reduced_times, reduced_values = reduction(0.0001).reduce(times, values, "CUBICSPLINE")
+
+    assert reduced_times is times and reduced_values is values
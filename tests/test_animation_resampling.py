@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+
+from io_scene_gltf2_importer.animation.resampling import Resampling
+
+
+def resample(times, values, interpolation, fps, in_tangents=None, out_tangents=None, rotation=False):
+    return Resampling(None).resample(np.array(times), np.array(values), interpolation, in_tangents, out_tangents, fps, rotation)
+
+
+def z_rotation(angle):
+    return [0.0, 0.0, math.sin(angle / 2.0), math.cos(angle / 2.0)]
+
+
+def test_linear_on_frame_grid():
+    sample_times, values, interpolation = resample([0.1, 1.0, 2.0], [[0.0, 10.0], [9.0, 10.0], [7.0, 0.0]], "LINEAR", 24.0)
+
+    assert interpolation == "LINEAR"
+    # Frames covering all keys, on integer frames
+    assert np.allclose(sample_times * 24.0, np.arange(2.0, 49.0))
+    assert np.allclose(values[:, 0], np.interp(sample_times, [0.1, 1.0, 2.0], [0.0, 9.0, 7.0]))
+    assert np.allclose(values[:, 1], np.interp(sample_times, [0.1, 1.0, 2.0], [10.0, 10.0, 0.0]))
+
+
+def test_step_on_frame_grid():
+    sample_times, values, interpolation = resample([0.0, 0.5, 1.0], [[1.0], [2.0], [3.0]], "STEP", 10.0)
+
+    assert interpolation == "STEP"
+    assert np.allclose(sample_times, np.arange(0, 11) / 10.0)
+    # Value changes exactly on the key frames
+    assert np.array_equal(values[:, 0], [1.0] * 5 + [2.0] * 5 + [3.0])
+
+
+def test_cubicspline_on_frame_grid():
+    # Hermite interpolation reproduces a cubic exactly when tangents are its derivative
+    def cubic(t):
+        return t ** 3 - 2.0 * t ** 2 + 0.5 * t + 1.0
+
+    def derivative(t):
+        return 3.0 * t ** 2 - 4.0 * t + 0.5
+
+    times = np.array([0.0, 0.7, 2.0])
+    tangents = derivative(times)[:, np.newaxis]
+    sample_times, values, interpolation = resample(times, cubic(times)[:, np.newaxis], "CUBICSPLINE", 24.0,
+                                                   in_tangents=tangents, out_tangents=tangents)
+
+    assert interpolation == "LINEAR"
+    assert np.allclose(sample_times * 24.0, np.arange(0.0, 49.0))
+    assert np.allclose(values[:, 0], cubic(sample_times))
+
+
+def test_rotation_slerp_on_frame_grid():
+    times = [0.0, 1.0]
+    values = [z_rotation(0.0), z_rotation(math.pi / 2.0)]
+    # Same rotation with opposite sign, interpolation must take the shortest path
+    values[1] = [-value for value in values[1]]
+
+    sample_times, values, interpolation = resample(times, values, "LINEAR", 4.0, rotation=True)
+
+    assert interpolation == "LINEAR"
+    assert np.allclose(sample_times, [0.0, 0.25, 0.5, 0.75, 1.0])
+    assert np.allclose(np.linalg.norm(values, axis=1), 1.0)
+    # Constant angular speed
+    expected = np.array([z_rotation(angle) for angle in sample_times * math.pi / 2.0])
+    assert np.allclose(np.abs(np.sum(values * expected, axis=1)), 1.0)
+
+
+def test_non_integer_frame_rate():
+    # NTSC: scene fps 30 with fps_base 1.001
+    fps = 30.0 / 1.001
+    times = [0.05, 1.0, 1.5]
+    sample_times, values, interpolation = resample(times, [[0.0], [1.0], [-1.0]], "LINEAR", fps)
+
+    frames = sample_times * fps
+    assert np.allclose(frames, np.round(frames))
+    assert np.allclose(frames, np.arange(math.floor(0.05 * fps), math.ceil(1.5 * fps) + 1))
+    # Keys on non integer frames are bracketed by samples
+    assert sample_times[0] <= times[0] and sample_times[-1] >= times[-1]
+    assert np.allclose(values[:, 0], np.interp(sample_times, times, [0.0, 1.0, -1.0]))
+
+
+def test_single_key_unchanged():
+    sample_times, values, interpolation = resample([0.3], [[5.0]], "CUBICSPLINE", 24.0)
+
+    assert np.array_equal(sample_times, [0.3])
+    assert np.array_equal(values, [[5.0]])
+    assert interpolation == "LINEAR"
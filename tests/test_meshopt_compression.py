@@ -0,0 +1,91 @@
+import logging
+import os
+
+import numpy as np
+import pytest
+
+from io_scene_gltf2_importer.buffer.extensions.EXT_meshopt_compression import EXT_meshopt_compression
+
+# Streams encoded by the reference meshoptimizer encoder, see fixtures/make_meshopt_fixtures.py
+FIXTURES = np.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "meshopt.npz"))
+
+
+class glTFStub():
+    def __init__(self):
+        self.log = logging.getLogger("glTFImporter")
+
+
+def decode(name):
+    count, stride, mode, filter = FIXTURES[name + "/params"]
+    ext = EXT_meshopt_compression({}, glTFStub())
+    ext.source = memoryview(FIXTURES[name + "/encoded"].tobytes())
+    ext.count  = int(count)
+    ext.stride = int(stride)
+    ext.mode   = str(mode)
+    ext.filter = str(filter)
+
+    data = ext.decode()
+    assert data is not None
+    return np.frombuffer(data, dtype=np.uint8), FIXTURES[name + "/expected"]
+
+
+@pytest.mark.parametrize("name", ["attributes_random", "attributes_smooth", "attributes_positions"])
+def test_vertex_buffer(name):
+    data, expected = decode(name)
+    assert np.array_equal(data, expected)
+
+
+@pytest.mark.parametrize("name", ["triangles_v0_32", "triangles_v0_16", "triangles_v1_32", "triangles_v1_16"])
+def test_index_buffer(name):
+    data, expected = decode(name)
+    assert np.array_equal(data, expected)
+
+
+def test_index_sequence():
+    data, expected = decode("indices")
+    assert np.array_equal(data, expected)
+
+
+@pytest.mark.parametrize("name, dtype", [("octahedral_8", '<i1'), ("octahedral_16", '<i2'), ("quaternion", '<i2')])
+def test_snorm_filters(name, dtype):
+    # Reference rounds differently, results are within 1 LSB
+    data, expected = decode(name)
+    assert np.abs(data.view(dtype).astype(int) - expected.view(dtype).astype(int)).max() <= 1
+
+
+def test_exponential_filter():
+    data, expected = decode("exponential")
+    assert np.array_equal(data, expected)
+
+
+def test_truncated_stream():
+    ext = EXT_meshopt_compression({}, glTFStub())
+    ext.source = memoryview(FIXTURES["attributes_smooth/encoded"].tobytes()[:50])
+    ext.count  = 300
+    ext.stride = 12
+    ext.mode   = "ATTRIBUTES"
+    ext.filter = "NONE"
+    assert ext.decode() is None
+
+
+def test_truncated_stream_without_fallback_data():
+    from io_scene_gltf2_importer.buffer.bufferview import BufferView
+    import base64
+
+    encoded = FIXTURES["attributes_smooth/encoded"].tobytes()[:50]
+    gltf = glTFStub()
+    gltf.is_glb_format = False
+    gltf.buffers = {}
+    gltf.decoded_bufferviews = {}
+    gltf.json = {'buffers': [
+        {'byteLength': 50, 'uri': "data:application/octet-stream;base64," + base64.b64encode(encoded).decode()},
+        {'byteLength': 3600, 'extensions': {'EXT_meshopt_compression': {'fallback': True}}}
+    ]}
+
+    bufferview = BufferView(0, {'buffer': 1, 'byteLength': 3600, 'byteStride': 12, 'extensions': {'EXT_meshopt_compression': {
+        'buffer': 0, 'byteLength': 50, 'byteStride': 12, 'count': 300, 'mode': "ATTRIBUTES"}}}, gltf)
+    bufferview.read()
+
+    # Never a view on uninitialized memory
+    with pytest.raises(RuntimeError):
+        bufferview.read_data(np.dtype('<f4'), 3, 300, 0)
@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+
+from io_scene_gltf2_importer.rig.nodetree import NodeTree
+
+
+def quantize(positions):
+    # Same scheme as gltfpack : uniform scale and offset to 16 bits integers
+    offset = positions.min(axis=0)
+    scale = (positions.max(axis=0) - offset).max() / 65535.0
+    dequantization = np.identity(4)
+    dequantization[0:3, 0:3] *= scale
+    dequantization[0:3, 3] = offset
+    return np.round((positions - offset) / scale), dequantization
+
+
+def test_skin_under_scaled_non_joint_parent():
+    # FBX style root : scale 0.01 and Y up rotation, not a joint
+    half = math.sqrt(0.5)
+    nodes = [
+        {'children': [1, 3], 'scale': [0.01, 0.01, 0.01], 'rotation': [-half, 0.0, 0.0, half]},
+        {'children': [2], 'translation': [0.0, 100.0, 0.0]},
+        {'translation': [0.0, 50.0, 10.0], 'rotation': [0.0, 0.0, half, half]},
+        {'mesh': 0, 'skin': 0}
+    ]
+    tree = NodeTree(nodes)
+    joint = 2
+
+    positions = np.random.default_rng(0).random((50, 3)) * 200.0 - 100.0
+    quantized, dequantization = quantize(positions)
+
+    # Quantizer inverse bind matrix, from world space, column major
+    inverse_bind_matrix = np.linalg.inv(tree.world_matrix(joint)).dot(dequantization)
+    inverse_bind_matrix = inverse_bind_matrix.T.ravel()
+
+    transform = tree.skin_dequantization(joint, inverse_bind_matrix)
+
+    assert np.allclose(transform, dequantization)
+    restored = quantized.dot(transform[0:3, 0:3].T) + transform[0:3, 3]
+    assert np.abs(restored - positions).max() <= dequantization[0, 0]
+
+
+def test_world_matrix_includes_all_ancestors():
+    nodes = [
+        {'children': [1], 'translation': [1.0, 2.0, 3.0]},
+        {'children': [2], 'scale': [2.0, 2.0, 2.0]},
+        {'matrix': [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 5, 0, 0, 1]}
+    ]
+    tree = NodeTree(nodes)
+
+    assert tree.parents == {1: 0, 2: 1}
+    point = tree.world_matrix(2).dot([0.0, 0.0, 0.0, 1.0])
+    assert np.allclose(point[0:3], [11.0, 2.0, 3.0])